@@ -0,0 +1,268 @@
+"""Vorberechnete Aggregate über athlete_events.
+
+Die Callbacks des Dashboards lesen nur noch aus diesen Tabellen, statt bei
+jeder Dropdown-Änderung den kompletten Datensatz zu filtern.
+
+Kommen Zeilen dazu (data_loader.append_games), werden Würfel und Tensoren
+nur um die Zählungen der neuen Zeilen ergänzt (merge_medal_cubes,
+extended); neue Codes und Jahre verlängern dabei die Achsen.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Schlüssel des Medaillen-Würfels: (Saison, Land) ist der Index, der Rest Spalten
+CUBE_KEYS = ['season', 'region', 'sport', 'sex', 'year', 'medal']
+# Eine Medaille im Medaillenspiegel: je Austragung, Wettbewerb, Land und Medaille (Teams zählen einfach)
+MEDAL_TABLE_KEYS = ['season', 'year', 'event', 'region', 'medal']
+
+
+def build_medal_cube(athlete_events, medal_table=False):
+    """Zählt Medaillen einmalig je (season, region, sport, sex, year, medal).
+
+    Mit medal_table=True zählt jede Medaille eines Teams nur einmal (erste
+    Zeile je MEDAL_TABLE_KEYS) – die Zeilen des Würfels sind dann eine
+    Teilmenge derer ohne Deduplizierung. Geschlecht und Sportart stammen aus
+    dieser ersten Zeile: die Sportart folgt aus dem Wettbewerb, ein gemischtes
+    Team (Mixed-Wettbewerbe) zählt im Geschlechterfilter aber nur für das
+    Geschlecht seiner ersten Zeile. So bleibt die Summe über alle
+    Geschlechter genau eine Medaille je Team.
+    """
+    medals = athlete_events[athlete_events['medal'].notna()]
+    if medal_table:
+        medals = medals.drop_duplicates(MEDAL_TABLE_KEYS)
+    cube = medals.groupby(CUBE_KEYS, observed=True).size().rename('count').reset_index()
+    # Kategorische Schlüssel als Integer-Codes ablegen – gleiche Codes wie in athlete_events
+    for column in CUBE_KEYS:
+        if isinstance(cube[column].dtype, pd.CategoricalDtype):
+            cube[column] = cube[column].cat.codes
+    # Innerhalb jedes (season, region)-Blocks nach Jahr sortiert – Zeiträume per binärer Suche
+    return cube.sort_values(['season', 'region', 'year'], kind='stable').set_index(['season', 'region'])
+
+
+def merge_medal_cubes(cube, delta):
+    """Würfel plus Delta-Würfel derselben Codes; gleiche Schlüssel werden addiert."""
+    df = pd.concat([cube, delta]).reset_index()
+    merged = df.groupby(CUBE_KEYS)['count'].sum().reset_index()
+    return merged.sort_values(['season', 'region', 'year'], kind='stable').set_index(['season', 'region'])
+
+
+def compact_medal_aggregate(cube, table_cube=None):
+    """Würfel je Saison-Code als Spaltenlisten (Integer-Codes) – klein genug für den Browser.
+
+    Mit table_cube (Medaillenspiegel) kommt dessen Zählung als Spalte
+    'table_count' an dieselben Zeilen (0, wo ein Schlüssel dort fehlt).
+    """
+    df = cube.reset_index()
+    columns = ['region', 'sport', 'sex', 'year', 'medal', 'count']
+    if table_cube is not None:
+        table = table_cube.reset_index().rename(columns={'count': 'table_count'})
+        df = df.merge(table, on=CUBE_KEYS, how='left', sort=False)
+        df['table_count'] = df['table_count'].fillna(0).astype(int)
+        columns.append('table_count')
+    return {
+        int(season): {column: block[column].tolist() for column in columns}
+        for season, block in df.groupby('season')
+    }
+
+
+def year_slice(years, start, end):
+    """Zeilenbereich der Jahre start..end in einem aufsteigend sortierten Jahres-Array."""
+    return slice(int(np.searchsorted(years, start, 'left')), int(np.searchsorted(years, end, 'right')))
+
+
+def slice_medal_cube(cube, season, regions, start, end, sport=None, gender=None, medal=None):
+    """Liefert die Würfelzeilen einer Auswahl (Integer-Codes); `None` bedeutet „Alle“.
+
+    Der Zeitraum wird je (season, region)-Block per binärer Suche geschnitten,
+    die übrigen Filter laufen nur noch auf diesem Ausschnitt.
+    """
+    parts = []
+    for region in regions:
+        if (season, region) in cube.index:
+            block = cube.xs((season, region), drop_level=False)
+            parts.append(block.iloc[year_slice(block['year'].values, start, end)])
+    if not parts:
+        return cube.iloc[0:0].reset_index()
+    df = pd.concat(parts).reset_index()
+    mask = np.ones(len(df), dtype=bool)
+    if sport is not None:
+        mask &= df['sport'].values == sport
+    if gender is not None:
+        mask &= df['sex'].values == gender
+    if medal is not None:
+        mask &= df['medal'].values == medal
+    return df[mask]
+
+
+def _top_per_group(df, keys, column):
+    """Häufigster Wert von column je Gruppe als {Gruppe: (Wert, Anzahl)}.
+
+    Bei Gleichstand gewinnt der erste Wert in Sortierreihenfolge (wie idxmax).
+    """
+    counts = df.groupby(keys + [column], observed=True).size()
+    top = counts.sort_values(ascending=False, kind='stable').groupby(level=list(range(len(keys)))).head(1)
+    return {index[:-1]: (index[-1], int(count)) for index, count in top.items()}
+
+
+def build_sport_facts(athlete_events):
+    """Alle Kennzahlen für sportart_fakten je (season-Code, sport-Code) in einem Durchlauf."""
+    df = athlete_events[['season', 'sport', 'year', 'name', 'region', 'medal']].assign(
+        season=athlete_events['season'].cat.codes,
+        sport=athlete_events['sport'].cat.codes
+    )
+    if 'event' in athlete_events.columns:
+        df['event'] = athlete_events['event']
+    df = df[df['sport'] >= 0]
+    keys = ['season', 'sport']
+    summary = df.groupby(keys, observed=True).agg(
+        editions=('year', 'nunique'),
+        first_year=('year', 'min'),
+        last_year=('year', 'max'),
+        athletes=('name', 'nunique'),
+        countries=('region', 'nunique'),
+    )
+    gold = df[df['medal'] == 'Gold']
+    tops = {
+        'top_athlete': _top_per_group(df, keys, 'name'),
+        'top_country': _top_per_group(df, keys, 'region'),
+        'top_gold_athlete': _top_per_group(gold, keys, 'name'),
+        'top_gold_country': _top_per_group(gold, keys, 'region'),
+        'top_event': _top_per_group(df, keys, 'event') if 'event' in df.columns else {},
+    }
+    facts = {}
+    for group, row in summary.iterrows():
+        entry = {name: int(value) for name, value in row.items()}
+        entry.update({name: top.get(group) for name, top in tops.items()})
+        facts[tuple(int(code) for code in group)] = entry
+    return facts
+
+
+class YearPrefixSums:
+    """Über die Jahre kumulierte Medaillenzahlen je Saison.
+
+    prefix[season] hat die Form (region, sex, medal, Jahre + 1); die Summe
+    über einen beliebigen Zeitraum [start, end] ist die Differenz zweier
+    Jahresspalten – unabhängig von Länge des Zeitraums und Zeilenzahl. Die
+    Sportart ist bereits herausgesummt: der Ländervergleich braucht sie nicht,
+    und sie wäre der größte Teil des Speichers je Worker.
+    """
+
+    def __init__(self, cube, shape):
+        self.shape = ()
+        self.years = {}
+        self.prefix = {}
+        self._add(cube, shape)
+
+    def extended(self, delta, shape):
+        """Kopie mit den Zählungen eines Delta-Würfels; shape (region, sex, medal) darf gewachsen sein."""
+        extended = copy.copy(self)
+        extended.years, extended.prefix = dict(self.years), dict(self.prefix)
+        extended._add(delta, shape)
+        return extended
+
+    def _add(self, cube, shape):
+        shape = tuple(shape)
+        blocks = dict(list(cube.reset_index().groupby('season')))
+        # Unberührte Saisons nur umbauen, wenn neue Codes die Achsen verlängert haben
+        seasons = set(blocks) | (set(self.prefix) if shape != self.shape else set())
+        for season in seasons:
+            block = blocks.get(season)
+            old_years = self.years.get(season, np.zeros(0, dtype=int))
+            years = old_years if block is None else np.union1d(old_years, block['year'].values)
+            counts = np.zeros(shape + (len(years) + 1,), dtype=np.int32)
+            if season in self.prefix:
+                # Zählungen je Jahr zurückgewinnen und an ihre (neuen) Positionen legen
+                old = self.prefix[season]
+                index = [np.arange(n) for n in old.shape[:-1]] + [np.searchsorted(years, old_years) + 1]
+                counts[np.ix_(*index)] = np.diff(old, axis=-1)
+            if block is not None:
+                # Spalte 0 bleibt 0, Jahr i landet in Spalte i + 1
+                np.add.at(
+                    counts,
+                    (block['region'].values, block['sex'].values, block['medal'].values,
+                     np.searchsorted(years, block['year'].values) + 1),
+                    block['count'].values
+                )
+            self.prefix[season] = np.cumsum(counts, axis=-1, out=counts)
+            self.years[season] = years
+        self.shape = shape
+
+    def totals(self, season, start, end, regions):
+        """Medaillen je (region, sex, medal) für die gegebenen Regionen im Zeitraum."""
+        if season not in self.prefix:
+            return None
+        bounds = year_slice(self.years[season], start, end)
+        prefix = self.prefix[season][regions]
+        return prefix[..., bounds.stop] - prefix[..., bounds.start]
+
+
+class HeatmapTensor:
+    """Dichte Medaillenzahlen (region, Sportart, Jahr) je Saison und Geschlecht.
+
+    Die Sportart-Achse ist einmalig übersetzt und nach deutscher Beschriftung
+    sortiert (wie zuvor groupby('sport_de')); eine Heatmap ist damit ein
+    einziger Ausschnitt plus Entfernen leerer Zeilen und Spalten.
+    """
+
+    def __init__(self, cube, n_regions, sport_labels):
+        self.sport_axis = np.zeros(0, dtype=object)
+        self.n_regions = 0
+        self.years = {}
+        self.by_sex = {}
+        self.all_sexes = {}
+        self._add(cube, n_regions, sport_labels)
+
+    def extended(self, delta, n_regions, sport_labels):
+        """Kopie mit den Zählungen eines Delta-Würfels; neue Regionen/Sportarten verlängern die Achsen."""
+        extended = copy.copy(self)
+        extended.years, extended.by_sex, extended.all_sexes = dict(self.years), dict(self.by_sex), dict(self.all_sexes)
+        extended._add(delta, n_regions, sport_labels)
+        return extended
+
+    def _add(self, cube, n_regions, sport_labels):
+        old_axis = self.sport_axis
+        # Gleiche Beschriftung für mehrere Codes landet in derselben Zeile
+        self.sport_axis, label_index = np.unique(sport_labels, return_inverse=True)
+        old_rows = np.searchsorted(self.sport_axis, old_axis)
+        df = cube.reset_index()
+        blocks = dict(list(df.groupby('season')))
+        n_sexes = max([int(df['sex'].max()) + 1 if len(df) else 0] + [t.shape[0] for t in self.by_sex.values()])
+        reshaped = n_regions != self.n_regions or not np.array_equal(old_axis, self.sport_axis)
+        for season in set(blocks) | (set(self.by_sex) if reshaped else set()):
+            block = blocks.get(season)
+            old_years = self.years.get(season, np.zeros(0, dtype=int))
+            years = old_years if block is None else np.union1d(old_years, block['year'].values)
+            counts = np.zeros((n_sexes, n_regions, len(self.sport_axis), len(years)), dtype=np.int32)
+            if season in self.by_sex:
+                old = self.by_sex[season]
+                counts[np.ix_(np.arange(old.shape[0]), np.arange(old.shape[1]), old_rows,
+                              np.searchsorted(years, old_years))] = old
+            if block is not None:
+                np.add.at(
+                    counts,
+                    (block['sex'].values, block['region'].values, label_index[block['sport'].values],
+                     np.searchsorted(years, block['year'].values)),
+                    block['count'].values
+                )
+            self.years[season] = years
+            self.by_sex[season] = counts
+            self.all_sexes[season] = counts.sum(axis=0)
+        self.n_regions = n_regions
+
+    def matrix(self, season, region, start, end, sex=None):
+        """(z, Sportarten, Jahre) für eine Region im Zeitraum, ohne leere Zeilen/Spalten."""
+        if season not in self.years or region is None or not 0 <= region < self.all_sexes[season].shape[0]:
+            return np.zeros((0, 0), dtype=np.int32), self.sport_axis[:0], np.zeros(0, dtype=int)
+        if sex is None:
+            tensor = self.all_sexes[season]
+        elif 0 <= sex < len(self.by_sex[season]):
+            tensor = self.by_sex[season][sex]
+        else:
+            return np.zeros((0, 0), dtype=np.int32), self.sport_axis[:0], np.zeros(0, dtype=int)
+        years = year_slice(self.years[season], start, end)
+        z = tensor[region, :, years]
+        rows = z.any(axis=1)
+        cols = z.any(axis=0)
+        return z[rows][:, cols], self.sport_axis[rows], self.years[season][years][cols]
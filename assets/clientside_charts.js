@@ -0,0 +1,170 @@
+// Clientseitiger Modus (CLIENTSIDE_CHARTS): Einzelvergleich und Ländervergleich werden im Browser
+// aus dem Saison-Aggregat im dcc.Store 'medal-aggregate' gefiltert und gezeichnet.
+// Die Figuren entsprechen denen der Server-Callbacks in olympische_Spiele_Deployment-Datei.py.
+(function () {
+    var has = function (obj, key) {
+        return Object.prototype.hasOwnProperty.call(obj, key);
+    };
+
+    // Titel-Zusatz: Name des festen Zeitraums oder "von–bis"
+    function periodLabel(aggregate, start, end) {
+        for (var name in aggregate.time_periods) {
+            var bounds = aggregate.time_periods[name];
+            if (bounds[0] === start && bounds[1] === end) {
+                return name;
+            }
+        }
+        return start + '–' + end;
+    }
+
+    function emptyFigure(aggregate, text) {
+        return {
+            data: [],
+            layout: {
+                template: aggregate.template,
+                annotations: [{text: text, x: 0.5, y: 0.5, showarrow: false}]
+            }
+        };
+    }
+
+    // Zählung der Zählweise: Medaillenspiegel (Team = 1) oder je Athleten-Zeile – wie count_mode()
+    function countsOf(data, mode) {
+        return mode === 'table' ? data.table_count : data.count;
+    }
+
+    function countModeSuffix(mode) {
+        return mode === 'table' ? ' – Medaillenspiegel' : '';
+    }
+
+    // Code eines Dropdown-Werts; "Alle" -> null, unbekannt -> -2 (passt auf keine Zeile)
+    function codeOf(codes, value) {
+        if (value === 'Alle') {
+            return null;
+        }
+        return has(codes, value) ? codes[value] : -2;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        olympia: {
+            medals_chart: function (tab, years, season, country, sport, gender, mode, aggregate) {
+                var noUpdate = window.dash_clientside.no_update;
+                var data = has(aggregate.seasons, season) ? aggregate.seasons[season] : null;
+                var triggered = (window.dash_clientside.callback_context.triggered || [])
+                    .map(function (t) { return t.prop_id; })
+                    .filter(function (id) { return id !== '.'; });
+                var options = noUpdate;
+                var sportValue = noUpdate;
+                // Saisonwechsel (und Start): Optionen setzen, Auswahl zurücksetzen – wie serverseitig
+                if (!triggered.length || triggered.indexOf('season-dropdown.value') >= 0) {
+                    options = data ? data.sport_options : aggregate.no_sport_options;
+                    sport = sportValue = 'Alle';
+                }
+                if (tab !== 'medals') {
+                    return [noUpdate, options, sportValue];
+                }
+
+                var start = Math.trunc(years[0]);
+                var end = Math.trunc(years[1]);
+                var region = has(aggregate.region_codes, country) ? aggregate.region_codes[country] : -2;
+                var sportCode = codeOf(aggregate.sport_codes, sport);
+                var sexCode = codeOf(aggregate.sex_codes, gender);
+                var perYear = {};
+                var medalsSeen = {};
+                var rows = data ? data.count.length : 0;
+                var count = data ? countsOf(data, mode) : [];
+                for (var i = 0; i < rows; i++) {
+                    if (data.region[i] !== region || data.year[i] < start || data.year[i] > end
+                        || (sportCode !== null && data.sport[i] !== sportCode)
+                        || (sexCode !== null && data.sex[i] !== sexCode) || !count[i]) {
+                        continue;
+                    }
+                    var counts = perYear[data.year[i]] = perYear[data.year[i]] || {};
+                    counts[data.medal[i]] = (counts[data.medal[i]] || 0) + count[i];
+                    medalsSeen[data.medal[i]] = true;
+                }
+                var xs = Object.keys(perYear).map(Number).sort(function (a, b) { return a - b; });
+                if (!xs.length) {
+                    return [emptyFigure(aggregate, '⚠️ Keine Daten verfügbar'), options, sportValue];
+                }
+                var traces = [];
+                ['Bronze', 'Silver', 'Gold'].forEach(function (m) {
+                    var code = aggregate.medal_labels.indexOf(m);
+                    if (code >= 0 && medalsSeen[code]) {
+                        traces.push({
+                            type: 'bar',
+                            x: xs,
+                            y: xs.map(function (y) { return perYear[y][code] || 0; }),
+                            name: m,
+                            marker: {color: aggregate.medal_colors[m]}
+                        });
+                    }
+                });
+                var figure = {
+                    data: traces,
+                    layout: {
+                        template: aggregate.template,
+                        barmode: 'stack',
+                        title: {text: country + ' – ' + (sport !== 'Alle' ? sport : 'alle Sportarten')
+                            + ' (' + season + ', ' + periodLabel(aggregate, start, end) + ')' + countModeSuffix(mode)},
+                        xaxis: {title: {text: 'Jahr'}},
+                        yaxis: {title: {text: 'Medaillen'}, tickformat: '.0f'}
+                    }
+                };
+                return [figure, options, sportValue];
+            },
+
+            country_comparison_chart: function (tab, years, season, countries, medalType, gender, mode, aggregate) {
+                if (tab !== 'country-comparison') {
+                    return window.dash_clientside.no_update;
+                }
+                var start = Math.trunc(years[0]);
+                var end = Math.trunc(years[1]);
+                var data = has(aggregate.seasons, season) ? aggregate.seasons[season] : null;
+                // Balken in der Reihenfolge der Auswahl – wie in_selection_order() serverseitig
+                countries = countries || [];
+                var known = countries.filter(function (c) { return has(aggregate.region_codes, c); });
+                var noData = '⚠️ Keine Medaillendaten für diese Auswahl';
+                if (!data || !known.length) {
+                    return emptyFigure(aggregate, noData);
+                }
+                var sums = {};
+                known.forEach(function (c) { sums[aggregate.region_codes[c]] = 0; });
+                var sexCode = codeOf(aggregate.sex_codes, gender);
+                var medalCode = medalType === 'Alle' ? null : aggregate.medal_labels.indexOf(medalType);
+                var count = countsOf(data, mode);
+                for (var i = 0; i < data.count.length; i++) {
+                    if (!has(sums, data.region[i]) || data.year[i] < start || data.year[i] > end
+                        || (sexCode !== null && data.sex[i] !== sexCode)
+                        || (medalCode !== null && data.medal[i] !== medalCode)) {
+                        continue;
+                    }
+                    sums[data.region[i]] += count[i];
+                }
+                var counts = countries.map(function (c) {
+                    return has(aggregate.region_codes, c) ? sums[aggregate.region_codes[c]] : 0;
+                });
+                if (!counts.some(function (n) { return n > 0; })) {
+                    return emptyFigure(aggregate, noData);
+                }
+                return {
+                    data: [{
+                        type: 'bar',
+                        x: countries,
+                        y: counts,
+                        marker: {color: aggregate.medal_colors[medalType]},
+                        text: counts,
+                        textposition: 'auto'
+                    }],
+                    layout: {
+                        template: aggregate.template,
+                        title: {text: 'Medaillenvergleich (' + medalType + ') – ' + season + ' '
+                            + periodLabel(aggregate, start, end) + (gender !== 'Alle' ? ', Geschlecht: ' + gender : '')
+                            + countModeSuffix(mode)},
+                        xaxis: {title: {text: 'Land'}},
+                        yaxis: {title: {text: 'Anzahl Medaillen'}, tickformat: '.0f'}
+                    }
+                };
+            }
+        }
+    });
+})();
@@ -0,0 +1,188 @@
+"""Callback-Benchmark: Latenz und Spitzenspeicher je Callback auf synthetischen Daten.
+
+Für jede Skalierung (Vielfaches der echten Zeilenzahl) wird ein Datensatz
+mit synthetic_data.py erzeugt (und im --data-dir wiederverwendet) und in
+einem frischen Prozess geladen. Gemessen wird ohne Figuren-Cache
+(FIGURE_CACHE_MB=0), also der Pfad eines Cache-Miss:
+
+* jede memoisierte Chart-/Fakten-Funktion über ein Eingabe-Raster
+  (Zeiträume × Saisons × Länder × Sportarten × Geschlechter), die Charts
+  zusätzlich im Medaillenspiegel-Modus ('medals [table]' usw.),
+* der Saisonwechsel als HTTP-Aktion (Einzelvergleich samt Sportarten-
+  Optionen und Fakten samt Auswahl – früher update_sport_options).
+
+Spitzenspeicher per tracemalloc in einem zweiten Durchlauf, damit die
+Zeitmessung nicht verfälscht wird.
+
+    python benchmarks/callbacks.py --scales 1 10 100 --json callbacks.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+APP_FILE = REPO / 'olympische_Spiele_Deployment-Datei.py'
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dash_client import DashClient  # noqa: E402
+import synthetic_data  # noqa: E402
+
+
+def load_app():
+    spec = importlib.util.spec_from_file_location('dashboard', APP_FILE)
+    dashboard = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dashboard)
+    return dashboard
+
+
+def input_grids(dashboard):
+    """Repräsentative Argumente je memoisierter Funktion (deutsche Dropdown-Werte).
+
+    Schlüssel ist der Name der Funktion, für den Medaillenspiegel mit
+    Zusatz ' [table]' – die Zählweise ist dann das letzte Argument.
+    """
+    data = dashboard.dataset
+    label_of_region = {code: de for de, code in data.region_codes_de.items()}
+    medals_per_region = data.medal_cubes['athletes'].groupby(level='region')['count'].sum().sort_values(ascending=False)
+    ranked = [label_of_region[code] for code in medals_per_region.index if code in label_of_region]
+    # Große, mittlere und kleine Länder
+    countries = ranked[:2] + ranked[len(ranked) // 2:len(ranked) // 2 + 1] + ranked[-1:]
+    years = [list(bounds) for bounds in data.time_periods.values()] + [[1960, 1988]]
+    grids = {'medals': [], 'heatmap': [], 'country-comparison': [], 'sportart-fakten': []}
+    for season in ['Summer', 'Winter']:
+        options, _ = data.season_sport_options.get(season, dashboard.no_season_sport_options)
+        sports = [o['value'] for o in options[:3]]
+        for y in years:
+            for gender in ['Alle', 'M', 'F']:
+                for country in countries:
+                    grids['heatmap'].append((y, season, country, gender))
+                    for sport in sports:
+                        grids['medals'].append((y, season, country, sport, gender))
+                for n in (2, 5, 10):
+                    for medal in ['Alle', 'Gold']:
+                        grids['country-comparison'].append((y, season, ranked[:n], medal, gender))
+        grids['sportart-fakten'] += [(o['value'], season) for o in options]
+    for name in ['medals', 'heatmap', 'country-comparison']:
+        grids[f'{name} [table]'] = [args + ('table',) for args in grids[name]]
+    return grids
+
+
+def summarize(seconds, peaks=None):
+    ms = sorted(s * 1000 for s in seconds)
+    result = {
+        'calls': len(ms),
+        'p50_ms': statistics.median(ms),
+        'p95_ms': ms[min(len(ms) - 1, int(0.95 * len(ms)))],
+        'max_ms': ms[-1],
+    }
+    if peaks:
+        result['peak_mib'] = max(peaks) / 2**20
+    return result
+
+
+def measure(func, args_list):
+    seconds = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        seconds.append(time.perf_counter() - start)
+    peaks = []
+    tracemalloc.start()
+    for args in args_list:
+        tracemalloc.reset_peak()
+        func(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return summarize(seconds, peaks)
+
+
+def run_child():
+    """Im Kindprozess: App laden und alle Callbacks messen, Ergebnis als JSON auf stdout."""
+    start = time.perf_counter()
+    dashboard = load_app()
+    results = {
+        'rows': len(dashboard.dataset.events),
+        'import_s': time.perf_counter() - start,
+        'callbacks': {},
+    }
+    for name, args_list in input_grids(dashboard).items():
+        results['callbacks'][name] = measure(dashboard.figure_cache.memoized[name.split(' ')[0]], args_list)
+
+    # Saisonwechsel über HTTP, wie ihn der Browser auslöst
+    client = DashClient(dashboard.server)
+    outputs = ['medals-chart.figure', 'sportart-fakten-output.children']
+    for output in outputs:
+        client.call(output)
+    seconds = []
+    for i in range(20):
+        season = ['Winter', 'Summer'][i % 2]
+        start = time.perf_counter()
+        for output in outputs:
+            status, _ = client.call(output, {'season-dropdown.value': season})
+            assert status == 200, status
+        seconds.append(time.perf_counter() - start)
+    results['callbacks']['season-change (HTTP)'] = summarize(seconds)
+    results['maxrss_mib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(results))
+
+
+def run_scale(scale, data_dir, seed):
+    source = Path(data_dir) / f"athlete_events_{scale:g}x_seed{seed}.pkl.gz"
+    if not source.exists():
+        print(f"Erzeuge {source} …", file=sys.stderr)
+        synthetic_data.write(synthetic_data.generate(scale, seed), source)
+    env = dict(
+        os.environ,
+        ATHLETE_EVENTS_PATH=str(source),
+        ATHLETE_EVENTS_STORE=str(source).replace('.pkl.gz', '.store'),
+        FIGURE_CACHE_MB='0',
+    )
+    for name in ['SHARED_CACHE_PATH', 'REQUEST_LOG_PATH', 'WARMUP_ON_BOOT', 'CLIENTSIDE_CHARTS']:
+        env.pop(name, None)
+    # Erster Start baut den Spalten-Cache – nicht mitmessen
+    subprocess.run([sys.executable, '-c', f"import runpy; runpy.run_path({str(APP_FILE)!r})"],
+                   check=True, env=env, cwd=REPO, capture_output=True)
+    out = subprocess.run([sys.executable, __file__, '--child'], check=True, env=env, cwd=REPO,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'olympia-benchmark'))
+    parser.add_argument('--json', help='Ergebnisse zusätzlich als JSON-Datei schreiben')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child()
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {}
+    for scale in args.scales:
+        result = report[f"{scale:g}x"] = run_scale(scale, args.data_dir, args.seed)
+        print(f"\n{scale:g}× ({result['rows']} Zeilen): Start {result['import_s']:.2f}s, "
+              f"max. RSS {result['maxrss_mib']:.0f} MiB")
+        print(f"  {'Callback':24s} {'Aufrufe':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s} {'Peak MiB':>9s}")
+        for name, r in result['callbacks'].items():
+            peak = f"{r['peak_mib']:9.2f}" if 'peak_mib' in r else f"{'–':>9s}"
+            print(f"  {name:24s} {r['calls']:7d} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['max_ms']:8.2f} {peak}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
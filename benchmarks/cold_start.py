@@ -0,0 +1,70 @@
+"""Kaltstart-Benchmark: Zeit vom Import des Dashboards bis zur ersten Antwort.
+
+Startet für jeden Lauf einen frischen Python-Prozess (wie ein neuer
+gunicorn-Worker), importiert die App, lädt die Seite und beantwortet den
+ersten Chart-Callback über den Flask-Testclient.
+
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --runs 3 --rebuild   # inkl. Cache-Neubau
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+APP_FILE = REPO / 'olympische_Spiele_Deployment-Datei.py'
+
+from column_store import remove_store  # noqa: E402
+
+# Läuft im Kindprozess: misst Import und erste Antworten ab Prozessbeginn
+CHILD = r'''
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {repo!r})
+spec = importlib.util.spec_from_file_location('dashboard', {app!r})
+dashboard = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dashboard)
+t_import = time.perf_counter()
+sys.path.insert(0, {benchmarks!r})
+from dash_client import DashClient
+# Layout und Abhängigkeiten laden, dann der erste Chart-Callback wie beim Seitenaufruf
+assert dashboard.server.test_client().get('/').status_code == 200
+client = DashClient(dashboard.server)
+status, body = client.call('medals-chart.figure')
+assert status == 200, body
+t_response = time.perf_counter()
+print(json.dumps({{'import_s': t_import - t0, 'first_response_s': t_response - t0}}))
+'''
+
+
+def run_once(rebuild):
+    if rebuild:
+        remove_store(os.environ.get('ATHLETE_EVENTS_STORE', 'athlete_events.store'))
+    code = CHILD.format(repo=str(REPO), app=str(APP_FILE), benchmarks=str(REPO / 'benchmarks'))
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process_s'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--rebuild', action='store_true', help='Cache vor jedem Lauf löschen')
+    args = parser.parse_args()
+
+    runs = [run_once(args.rebuild) for _ in range(args.runs)]
+    for key in ('import_s', 'first_response_s', 'process_s'):
+        values = [r[key] for r in runs]
+        print(f"{key:18s} median {statistics.median(values):7.3f}s  min {min(values):7.3f}s  max {max(values):7.3f}s")
+
+
+if __name__ == '__main__':
+    main()
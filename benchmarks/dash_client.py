@@ -0,0 +1,156 @@
+"""Dash-Callbacks ohne Browser auslösen – für Benchmarks, Lasttests und tests/.
+
+Startwerte kommen aus /_dash-layout, die Callbacks aus /_dash-dependencies;
+jeder Aufruf geht wie beim Renderer über /_dash-update-component. Antworten
+(auch dash.Patch) werden in die lokalen Eigenschaftswerte übernommen, damit
+aufeinanderfolgende Aufrufe denselben Zustand sehen wie im Browser.
+
+Transport ist entweder der Flask-Testclient (in-process) oder eine URL.
+Hintergrund-Callbacks (BACKGROUND_CALLBACKS) werden wie im Browser bis zum
+Ergebnis abgefragt.
+"""
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+class DashClient:
+    # Abfrage-Intervall für Hintergrund-Jobs (der Renderer nutzt 1 s)
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, server=None, url=None):
+        if (server is None) == (url is None):
+            raise ValueError("Entweder server (Flask-App) oder url angeben")
+        self.client = server.test_client() if server is not None else None
+        self.url = url.rstrip('/') if url else None
+        self.props = {}
+        self._collect(self.request('GET', '/_dash-layout')[1])
+        self.callbacks = {
+            cb['output']: cb for cb in self.request('GET', '/_dash-dependencies')[1]
+            if not cb.get('clientside_function')
+        }
+
+    def request(self, method, path, payload=None):
+        """(Status, JSON oder None) für einen Aufruf gegen den Dash-Server."""
+        if self.client is not None:
+            response = self.client.open(path, method=method, json=payload)
+            body = response.get_data()
+            status = response.status_code
+        else:
+            data = json.dumps(payload).encode('utf-8') if payload is not None else None
+            req = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+            try:
+                with urllib.request.urlopen(req) as response:
+                    body = response.read()
+                    status = response.status
+            except urllib.error.HTTPError as err:
+                return err.code, None
+        if status >= 400:
+            # Fehlerseiten (z. B. HTML bei 500) sind kein JSON – nur den Status melden
+            return status, None
+        return status, (json.loads(body) if body else None)
+
+    def _collect(self, node):
+        # Komponentenbaum aus /_dash-layout: Props aller Komponenten mit id merken
+        if isinstance(node, list):
+            for child in node:
+                self._collect(child)
+        elif isinstance(node, dict) and 'props' in node:
+            props = node['props']
+            if 'id' in props:
+                for prop, value in props.items():
+                    self.props[f"{props['id']}.{prop}"] = value
+            self._collect(props.get('children'))
+
+    def callback(self, output):
+        """Callback, zu dessen Ausgaben output ('id.prop') gehört."""
+        for spec, cb in self.callbacks.items():
+            if output in (f"{o['id']}.{o['property']}" for o in self.outputs(spec)):
+                return cb
+        raise KeyError(output)
+
+    @staticmethod
+    def outputs(spec):
+        parts = spec[2:-2].split('...') if spec.startswith('..') else [spec]
+        return [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in parts]
+
+    def call(self, output, values=None, changed=None):
+        """Löst den Callback von output aus; values ({'id.prop': Wert}) gelten als geänderte Eingaben.
+
+        Ohne values ist es ein Initialaufruf (keine changedPropIds).
+        """
+        values = values or {}
+        self.props.update(values)
+        changed = list(values) if changed is None else changed
+        status, body, _ = self.send(self.callback(output), changed)
+        return status, body
+
+    def action(self, values=None):
+        """Nutzeraktion wie im Browser: setzt values und löst alle davon abhängigen Callbacks aus,
+        danach die durch deren Ausgaben ausgelösten. Ohne values: Seitenaufruf (alle Callbacks).
+
+        Liefert [(Callback, Status, Sekunden)] in Aufrufreihenfolge.
+        """
+        calls = []
+        pending = set(values or ())
+        self.props.update(values or {})
+        initial = values is None
+        while pending or initial:
+            updated = set()
+            for spec, cb in self.callbacks.items():
+                inputs = {f"{i['id']}.{i['property']}" for i in cb['inputs']}
+                triggered = inputs & pending
+                # prevent_initial_call: beim Seitenaufruf nur, wenn ein anderer Callback eine Eingabe setzt
+                if not triggered and not (initial and not cb.get('prevent_initial_call')):
+                    continue
+                start = time.perf_counter()
+                status, _, changed = self.send(cb, sorted(triggered))
+                calls.append((spec, status, time.perf_counter() - start))
+                # Eigene Ausgaben lösen denselben Callback nicht erneut aus (wie im Renderer)
+                updated |= changed - inputs
+            pending, initial = updated, False
+        return calls
+
+    def send(self, cb, changed):
+        """(Status, Antwort, geänderte 'id.prop') für einen Aufruf von cb mit den aktuellen Werten."""
+        outputs = self.outputs(cb['output'])
+        payload = {
+            'output': cb['output'],
+            'outputs': outputs if len(outputs) > 1 else outputs[0],
+            'inputs': [dict(i, value=self.props.get(f"{i['id']}.{i['property']}")) for i in cb['inputs']],
+            'changedPropIds': list(changed),
+            'state': [dict(s, value=self.props.get(f"{s['id']}.{s['property']}")) for s in cb['state']],
+        }
+        status, body = self.request('POST', '/_dash-update-component', payload)
+        # Hintergrund-Callback: Antwort ist nur der Job – abfragen, bis das Ergebnis da ist
+        if status == 200 and 'job' in body and 'response' not in body:
+            query = urllib.parse.urlencode({'cacheKey': body['cacheKey'], 'job': body['job']})
+            while status == 200 and 'response' not in body:
+                time.sleep(self.POLL_INTERVAL)
+                status, body = self.request('POST', f'/_dash-update-component?{query}', payload)
+        updated = set()
+        if status == 200:
+            for component_id, props in body['response'].items():
+                for prop, value in props.items():
+                    key = f'{component_id}.{prop}'
+                    self.props[key] = self.apply(self.props.get(key), value)
+                    updated.add(key)
+        return status, body, updated
+
+    @staticmethod
+    def apply(current, value):
+        # dash.Patch: Zuweisungen an Pfade der bisherigen Eigenschaft (das Dashboard nutzt nur Assign)
+        if not (isinstance(value, dict) and '__dash_patch_update' in value):
+            return value
+        for operation in value['operations']:
+            if operation['operation'] != 'Assign':
+                raise NotImplementedError(operation['operation'])
+            *path, last = operation['location']
+            target = current
+            for step in path:
+                target = target[step]
+            target[last] = operation['params']['value']
+        return current
@@ -0,0 +1,246 @@
+"""Lasttest: realistische Klickfolgen gegen /_dash-update-component.
+
+Jeder virtuelle Nutzer lädt die Seite (alle Callbacks) und führt dann
+zufällige, aber per --seed reproduzierbare Aktionen aus – Saisonwechsel
+(samt Zurücksetzen der Sportart), Länderwechsel, Bearbeiten des
+Ländervergleichs, Tabwechsel, Geschlecht, Jahresbereich, Sportart und
+Zählweise. Jede
+Aktion löst wie im Browser alle abhängigen Callbacks aus (dash_client.py).
+Mit --save-script werden die ausgeführten Aktionen gespeichert, mit
+--script exakt wiederholt.
+
+Ziel ist die App im selben Prozess (Flask-Testclient) oder ein laufender
+Server, z. B. gunicorn auf localhost:
+
+    python benchmarks/load_test.py --users 8 --duration 30 --json load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 32 --duration 60
+
+Ausgegeben werden je Callback Durchsatz, p50/p95/p99-Latenz und
+Fehlerquote, je Aktionsart die Latenz der ganzen Kaskade; --json schreibt
+alles samt Commit und Parametern zum Vergleich zwischen Ständen.
+"""
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from dash_client import DashClient
+
+REPO = Path(__file__).resolve().parent.parent
+
+# Relative Häufigkeit der Aktionsarten
+ACTION_WEIGHTS = {
+    'season': 2,
+    'country': 4,
+    'multi-country': 3,
+    'tab': 3,
+    'gender': 2,
+    'years': 3,
+    'sport': 3,
+    'count-mode': 1,
+}
+
+
+def option_values(client, component):
+    return [o['value'] if isinstance(o, dict) else o for o in client.props.get(f'{component}.options') or []]
+
+
+def next_action(client, rng, kind):
+    """Eingabewerte ({'id.prop': Wert}) einer zufälligen Aktion der Art kind im aktuellen Zustand."""
+    props = client.props
+    if kind == 'season':
+        return {'season-dropdown.value': 'Winter' if props.get('season-dropdown.value') == 'Summer' else 'Summer'}
+    if kind == 'country':
+        return {'country-dropdown.value': rng.choice(option_values(client, 'country-dropdown'))}
+    if kind == 'multi-country':
+        selected = list(props.get('multi-country-dropdown.value') or [])
+        if selected and (len(selected) >= 6 or rng.random() < 0.4):
+            selected.remove(rng.choice(selected))
+        else:
+            selected.append(rng.choice(option_values(client, 'multi-country-dropdown')))
+        return {'multi-country-dropdown.value': selected}
+    if kind == 'tab':
+        tabs = ['medals', 'heatmap', 'country-comparison']
+        return {'chart-tabs.value': rng.choice([t for t in tabs if t != props.get('chart-tabs.value')])}
+    if kind == 'gender':
+        return {'gender-dropdown.value': rng.choice(['Alle', 'M', 'F'])}
+    if kind == 'years':
+        low, high = props['year-slider.min'], props['year-slider.max']
+        start = rng.randrange(low, high + 1)
+        return {'year-slider.value': [start, rng.randrange(start, high + 1)]}
+    if kind == 'sport':
+        return {'sport-dropdown.value': rng.choice(option_values(client, 'sport-dropdown'))}
+    if kind == 'count-mode':
+        return {'count-mode-dropdown.value': 'athletes' if props.get('count-mode-dropdown.value') == 'table' else 'table'}
+    raise ValueError(kind)
+
+
+class LoadTest:
+    def __init__(self, make_client, users, duration, max_actions, think, seed, script=None):
+        self.make_client = make_client
+        self.users = users
+        self.duration = duration
+        self.max_actions = max_actions
+        self.think = think
+        self.seed = seed
+        self.script = script  # je Nutzer eine Liste von (Art, Werte) zum Wiederholen
+        self.calls = []  # (Callback, Status, Sekunden)
+        self.actions = []  # (Art, Sekunden, Fehler)
+        self.executed = [[] for _ in range(users)]
+        self.errors = defaultdict(int)
+
+    def run_user(self, user, deadline):
+        rng = random.Random(self.seed * 1000 + user)
+        kinds, weights = zip(*ACTION_WEIGHTS.items())
+        try:
+            client = self.make_client()
+            self.record('page-load', client.action())
+        except Exception as err:  # noqa: BLE001 – Fehler zählen, Lasttest läuft weiter
+            self.errors[type(err).__name__] += 1
+            self.actions.append(('page-load', 0.0, True))
+            return
+        steps = self.script[user] if self.script is not None else None
+        n = 0
+        while time.monotonic() < deadline and (self.max_actions is None or n < self.max_actions):
+            if steps is not None:
+                if n >= len(steps):
+                    break
+                kind, values = steps[n]
+            else:
+                kind = rng.choices(kinds, weights)[0]
+                values = next_action(client, rng, kind)
+            self.executed[user].append((kind, values))
+            try:
+                self.record(kind, client.action(values))
+            except Exception as err:  # noqa: BLE001
+                self.errors[type(err).__name__] += 1
+                self.actions.append((kind, 0.0, True))
+            n += 1
+            if self.think:
+                time.sleep(self.think)
+
+    def record(self, kind, calls):
+        self.calls += calls
+        self.actions.append((kind, sum(seconds for _, _, seconds in calls), any(s >= 400 for _, s, _ in calls)))
+
+    def run(self):
+        # Ein Seitenaufruf vorab (nicht gemessen): Importe und erste Serialisierung laufen nicht
+        # gleichzeitig in allen Nutzer-Threads an
+        self.make_client().action()
+        deadline = time.monotonic() + self.duration
+        threads = [threading.Thread(target=self.run_user, args=(u, deadline)) for u in range(self.users)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples, wall):
+    """samples: Liste (Sekunden, Fehler) -> Kennzahlen."""
+    ms = sorted(seconds * 1000 for seconds, _ in samples)
+    errors = sum(1 for _, error in samples if error)
+    return {
+        'count': len(samples),
+        'throughput_per_s': len(samples) / wall if wall else None,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'p50_ms': percentile(ms, 0.50),
+        'p95_ms': percentile(ms, 0.95),
+        'p99_ms': percentile(ms, 0.99),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='laufender Server (sonst App im selben Prozess)')
+    parser.add_argument('--users', type=int, default=4, help='gleichzeitige virtuelle Nutzer')
+    parser.add_argument('--duration', type=float, default=20, help='Sekunden')
+    parser.add_argument('--actions', type=int, help='höchstens so viele Aktionen je Nutzer')
+    parser.add_argument('--think-ms', type=float, default=0, help='Pause zwischen Aktionen')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--script', help='gespeicherte Aktionen wiederholen (JSON von --save-script)')
+    parser.add_argument('--save-script', help='ausgeführte Aktionen als JSON speichern')
+    parser.add_argument('--json', help='Ergebnisse als JSON speichern')
+    args = parser.parse_args()
+
+    if args.url:
+        def make_client():
+            return DashClient(url=args.url)
+    else:
+        from callbacks import load_app
+        server = load_app().server
+
+        def make_client():
+            return DashClient(server)
+
+    script = None
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+        args.users = len(script)
+    test = LoadTest(make_client, args.users, args.duration, args.actions, args.think_ms / 1000, args.seed, script)
+    wall = test.run()
+
+    by_callback = defaultdict(list)
+    for spec, status, seconds in test.calls:
+        label = '+'.join(f"{o['id']}.{o['property']}" for o in DashClient.outputs(spec)[:1])
+        by_callback[label].append((seconds, status >= 400))
+    by_action = defaultdict(list)
+    for kind, seconds, error in test.actions:
+        by_action[kind].append((seconds, error))
+
+    report = {
+        'commit': git_commit(),
+        'target': args.url or 'in-process',
+        'users': args.users,
+        'duration_s': wall,
+        'seed': args.seed,
+        'think_ms': args.think_ms,
+        'total': summarize([(s, st >= 400) for _, st, s in test.calls], wall),
+        'callbacks': {label: summarize(samples, wall) for label, samples in sorted(by_callback.items())},
+        'actions': {kind: summarize(samples, wall) for kind, samples in sorted(by_action.items())},
+        'exceptions': dict(test.errors),
+    }
+
+    print(f"{report['target']}, {args.users} Nutzer, {wall:.1f}s, Commit {report['commit']}")
+    header = f"  {'':34s} {'Anzahl':>7s} {'/s':>8s} {'Fehler':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+    for title, rows in [('Callbacks', report['callbacks']), ('Aktionen (ganze Kaskade)', report['actions']),
+                        ('Gesamt', {'alle Callbacks': report['total']})]:
+        print(f"\n{title}\n{header}")
+        for name, r in rows.items():
+            if not r['count']:
+                continue
+            print(f"  {name:34s} {r['count']:7d} {r['throughput_per_s']:8.1f} {r['error_rate']:7.1%} "
+                  f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f}")
+    if test.errors:
+        print(f"\nAusnahmen: {dict(test.errors)}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_script:
+        with open(args.save_script, 'w', encoding='utf-8') as f:
+            json.dump(test.executed, f, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Synthetischer athlete_events-Datensatz im Schema des Originals, in beliebiger Größe.
+
+Die Originaldaten (athlete_events.pkl.gz, ~271 000 Zeilen) liegen nicht im
+Repo. Dieser Generator erzeugt dieselben Spalten mit ähnlichen Verteilungen
+(Saisonanteil, Medaillenquote, wenige große und viele kleine Länder), damit
+Benchmarks und Kapazitätsplanung ohne die echten Daten laufen – auch mit
+10× oder 100× so vielen Zeilen. Sportarten und Länder stammen aus den
+Übersetzungstabellen des Dashboards.
+
+    python benchmarks/synthetic_data.py --scale 10 --out athlete_events_10x.pkl.gz
+
+Mit einer .csv als --out entstehen stattdessen die Roh-CSVs im Kaggle-Format
+(athlete_events.csv ohne Region plus noc_regions.csv daneben) – Eingabe
+für ingest.py.
+"""
+import argparse
+import ast
+import gzip
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO = Path(__file__).resolve().parent.parent
+APP_FILE = REPO / 'olympische_Spiele_Deployment-Datei.py'
+
+# Zeilenzahl des echten Datensatzes (Skalierung 1×)
+REAL_ROWS = 271116
+
+WINTER_SPORTS = {
+    'Alpine Skiing', 'Biathlon', 'Bobsleigh', 'Cross Country Skiing', 'Curling', 'Figure Skating',
+    'Freestyle Skiing', 'Ice Hockey', 'Luge', 'Military Ski Patrol', 'Nordic Combined',
+    'Short Track Speed Skating', 'Skeleton', 'Ski Jumping', 'Snowboarding', 'Speed Skating',
+}
+SUMMER_YEARS = sorted([y for y in range(1896, 2017, 4) if y not in (1916, 1940, 1944)] + [1906])
+WINTER_YEARS = [y for y in range(1924, 1993, 4) if y not in (1940, 1944)] + list(range(1994, 2015, 4))
+EVENTS_PER_SPORT = 5
+# Die größten Teilnehmerländer zuerst, danach alle übrigen in zufälliger Reihenfolge
+LARGE_REGIONS = ['USA', 'Germany', 'France', 'UK', 'Italy', 'Russia', 'Canada', 'Sweden', 'Australia', 'Japan']
+
+
+def translation_keys(name):
+    """Englische Schlüssel einer Übersetzungstabelle (dict-Literal) aus dem Dashboard-Code."""
+    tree = ast.parse(APP_FILE.read_text(encoding='utf-8'))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == name for t in node.targets):
+            return sorted(ast.literal_eval(node.value))
+    raise KeyError(name)
+
+
+def noc_codes(regions):
+    """Eindeutige dreistellige NOC je Region (wie im Original ein Kürzel je Land)."""
+    codes = []
+    for region in regions:
+        letters = ''.join(c for c in region.upper() if c.isalpha()) + 'XXX'
+        code = letters[:3]
+        i = 0
+        while code in codes:
+            code = f"{letters[:2]}{i}"
+            i += 1
+        codes.append(code)
+    return codes
+
+
+def categorical(codes, categories):
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def generate(scale=1.0, seed=0):
+    """DataFrame mit round(scale * REAL_ROWS) Zeilen; Text-Spalten direkt als Kategorien."""
+    rng = np.random.default_rng(seed)
+    n = int(round(scale * REAL_ROWS))
+    sports = translation_keys('sport_translation')
+    # Wie im Original gibt es auch Regionen ohne Übersetzung (z. B. USA)
+    regions = sorted(set(translation_keys('country_translation')) | set(LARGE_REGIONS))
+    winter_sports = np.array([i for i, s in enumerate(sports) if s in WINTER_SPORTS])
+    summer_sports = np.array([i for i, s in enumerate(sports) if s not in WINTER_SPORTS])
+
+    # season: 0 = Summer, 1 = Winter (alphabetische Kategorien)
+    season = (rng.random(n) < 0.18).astype(np.int8)
+    winter = season == 1
+    sport = summer_sports[rng.integers(0, len(summer_sports), n)]
+    sport[winter] = winter_sports[rng.integers(0, len(winter_sports), winter.sum())]
+    year = np.array(SUMMER_YEARS)[rng.integers(0, len(SUMMER_YEARS), n)]
+    year[winter] = np.array(WINTER_YEARS)[rng.integers(0, len(WINTER_YEARS), winter.sum())]
+    sex = (rng.random(n) < 0.72).astype(np.int8)  # 0 = F, 1 = M
+    # Wenige große, viele kleine Länder (Zipf über eine Rangfolge); ein kleiner Teil ohne Region
+    large = [regions.index(r) for r in LARGE_REGIONS if r in regions]
+    rest = [i for i in range(len(regions)) if i not in large]
+    ranking = np.array(large + list(rng.permutation(rest)), dtype=np.int32)
+    region = ranking[(rng.zipf(1.6, n) - 1) % len(regions)]
+    region[rng.random(n) < 0.001] = -1
+    medal = np.where(rng.random(n) < 0.85, -1, rng.integers(0, 3, n)).astype(np.int8)  # Bronze, Gold, Silver
+    athletes = max(n // 2, 1)
+    name = rng.integers(0, athletes, n)
+    event = (sport * 2 + sex) * EVENTS_PER_SPORT + rng.integers(0, EVENTS_PER_SPORT, n)
+
+    games = [f"{y} Summer" for y in SUMMER_YEARS] + [f"{y} Winter" for y in WINTER_YEARS]
+    games_code = np.where(winter, len(SUMMER_YEARS) + np.searchsorted(WINTER_YEARS, year),
+                          np.searchsorted(SUMMER_YEARS, year))
+    noc = noc_codes(regions)
+
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'name': categorical(name, [f"Athlete {i}" for i in range(athletes)]),
+        'sex': categorical(sex, ['F', 'M']),
+        'age': np.where(rng.random(n) < 0.03, np.nan, rng.integers(14, 45, n)),
+        'height': np.where(rng.random(n) < 0.2, np.nan, rng.normal(176, 10, n).round()),
+        'weight': np.where(rng.random(n) < 0.2, np.nan, rng.normal(71, 14, n).round()),
+        'team': categorical(region, regions),
+        'noc': pd.Categorical(np.array(noc + [None], dtype=object)[region]),
+        'games': categorical(games_code, games),
+        'year': year,
+        'season': categorical(season, ['Summer', 'Winter']),
+        'city': categorical(games_code, [f"City {g}" for g in games]),
+        'sport': categorical(sport, sports),
+        'event': categorical(event, [
+            f"{s} {'Men' if x else 'Women'}'s Event {k + 1}"
+            for s in sports for x in (0, 1) for k in range(EVENTS_PER_SPORT)
+        ]),
+        'medal': categorical(medal, ['Bronze', 'Gold', 'Silver']),
+        'region': categorical(region, regions),
+        'notes': categorical(np.full(n, -1, dtype=np.int8), []),
+    })
+
+
+def write(df, path):
+    # Schnelle Kompression – bei 100× dominiert sonst gzip die Laufzeit
+    with gzip.open(path, 'wb', compresslevel=1) as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write_csv(df, path):
+    """athlete_events.csv (Kaggle-Spalten, ohne Region) und noc_regions.csv im selben Verzeichnis."""
+    columns = {c: c.upper() if c in ('id', 'noc') else c.capitalize() for c in df.columns}
+    df.drop(columns=['region', 'notes']).rename(columns=columns).to_csv(path, index=False, chunksize=100_000)
+    regions = df[['noc', 'region']].dropna().drop_duplicates('noc').sort_values('noc')
+    regions.assign(notes=None).rename(columns={'noc': 'NOC'}).to_csv(
+        Path(path).with_name('noc_regions.csv'), index=False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='Vielfaches der echten Zeilenzahl')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='athlete_events.pkl.gz')
+    args = parser.parse_args()
+    df = generate(args.scale, args.seed)
+    if args.out.endswith('.csv'):
+        write_csv(df, args.out)
+    else:
+        write(df, args.out)
+    print(f"{len(df)} Zeilen nach {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Spaltenweiser Datensatz auf der Platte, read-only per Memory-Map geöffnet.
+
+Jede Spalte liegt als eigene .npy-Datei im Store-Verzeichnis, kategorische
+Spalten als Integer-Codes plus Wörterbuch in meta.json. Da alle
+gunicorn-Worker dieselben Dateien mappen, teilen sie sich die physischen
+Seiten – kein Entpacken und keine private Kopie pro Worker.
+
+Jeder Schreibvorgang legt eine neue Version in einem eigenen Verzeichnis
+`<path>@<n>` an; `<path>` ist ein symbolischer Link auf die aktuelle Version
+und wird per os.replace atomar umgehängt. Leser sehen so immer eine
+vollständige Version, laufende Worker erkennen eine neue an
+current_version() und bleiben bis dahin auf ihren (gemappten) Dateien.
+
+Gebaut und aktuell gehalten wird der Store von data_loader.py.
+"""
+import glob
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 1
+META_FILE = 'meta.json'
+# Versionen, die nach einem Tausch liegen bleiben (die aktuelle eingeschlossen)
+KEEP_VERSIONS = 2
+
+
+def version_dir(path, version):
+    return f"{path}@{version}"
+
+
+def current_version(path):
+    """Nummer der Version, auf die path zeigt (None ohne Store oder bei altem Layout ohne Link)."""
+    try:
+        target = os.readlink(path)
+    except OSError:
+        return None
+    return int(target.rsplit('@', 1)[1])
+
+
+class StoreWriter:
+    """Schreibt eine neue Version Spalte für Spalte; commit() legt meta.json an und hängt den Link um."""
+
+    def __init__(self, path):
+        self.path = path
+        self.version = (read_meta(path) or {}).get('version', 0) + 1
+        self.directory = version_dir(path, self.version)
+        self.columns = []
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory)
+
+    def _entry(self, name, categories):
+        entry = {'name': name, 'file': f"{name}.npy"}
+        if categories is not None:
+            entry['categories'] = list(categories)
+        self.columns.append(entry)
+        return os.path.join(self.directory, entry['file'])
+
+    def save_column(self, name, values, categories=None):
+        """Ganze Spalte schreiben; bei kategorischen Spalten sind values die Codes."""
+        np.save(self._entry(name, categories), values)
+
+    def open_column(self, name, dtype, rows, categories=None):
+        """Leere Spalte als beschreibbare Memory-Map – zum abschnittsweisen Füllen."""
+        return np.lib.format.open_memmap(self._entry(name, categories), mode='w+', dtype=dtype, shape=(rows,))
+
+    def commit(self, rows, extra_meta=None):
+        meta = dict(extra_meta or {}, format=STORE_FORMAT, version=self.version, rows=rows, columns=self.columns)
+        with open(os.path.join(self.directory, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        # Altes Layout (Verzeichnis statt Link) einmalig ersetzen
+        if os.path.isdir(self.path) and not os.path.islink(self.path):
+            shutil.rmtree(self.path)
+        link = f"{self.path}.link"
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.basename(self.directory), link)
+        os.replace(link, self.path)
+        prune_versions(self.path, self.version)
+
+
+def write_store(df, path, extra_meta=None):
+    """Schreibt df spaltenweise als neue Version und hängt path atomar darauf um.
+
+    extra_meta landet zusätzlich in meta.json (z. B. Cache-Version, vorberechnete
+    Listen); meta['version'] zählt die Versionen hoch.
+    """
+    writer = StoreWriter(path)
+    for name in df.columns:
+        column = df[name]
+        if column.dtype == object:
+            column = column.astype('category')
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            writer.save_column(name, column.cat.codes.values, column.cat.categories.tolist())
+        else:
+            writer.save_column(name, column.values)
+    writer.commit(len(df), extra_meta)
+
+
+def prune_versions(path, version):
+    # Worker, die noch eine ältere Version gemappt haben, lesen ihre Dateien auch nach dem Löschen weiter
+    for old in glob.glob(f"{glob.escape(path)}@*"):
+        if int(old.rsplit('@', 1)[1]) <= version - KEEP_VERSIONS:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def remove_store(path):
+    """Löscht den Store samt aller Versionen."""
+    if os.path.islink(path):
+        os.remove(path)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+    for old in glob.glob(f"{glob.escape(path)}@*"):
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def read_meta(path):
+    """meta.json des Stores oder None, falls es (noch) keinen Store gibt."""
+    try:
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def open_store(path):
+    """Öffnet den Store als DataFrame, dessen Spalten direkt auf den gemappten Dateien liegen."""
+    # Link einmal auflösen: Metadaten und Spalten stammen sicher aus derselben Version
+    path = os.path.realpath(path)
+    meta = read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"Kein Store unter {path}")
+    if meta.get('format') != STORE_FORMAT:
+        raise ValueError(f"Unbekanntes Store-Format in {path}: {meta.get('format')}")
+    data = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if 'categories' in entry:
+            values = pd.Categorical.from_codes(values, categories=entry['categories'])
+        data[entry['name']] = values
+    # copy=False: keine Konsolidierung in neue Blöcke, die Spalten bleiben gemappt
+    return pd.DataFrame(data, copy=False)
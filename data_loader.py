@@ -0,0 +1,283 @@
+"""Schneller Start: athlete_events aus einem einmal gebauten Spalten-Cache laden.
+
+Der Cache (siehe column_store.py) wird aus der Pickle-Datei neu gebaut, wenn
+er fehlt, eine andere Cache-Version hat oder die Quelle sich geändert hat
+(Größe/mtime, im Zweifel SHA-256). Zusätzlich legt er die Listen für die
+Dropdowns ab, damit beim Worker-Start nichts mehr über den Datensatz läuft.
+
+Die Zeilen liegen nach (season, year) sortiert; meta['partitions'] hält je
+Saison den zusammenhängenden Zeilenbereich – Abfragen auf Zeilenebene
+(z. B. beim Nachberechnen der Fakten) bleiben darin.
+
+Neue Spiele (z. B. Tokio 2020) kommen per append_games als CSV dazu, ohne
+die Pickle-Datei neu zu erzeugen: die Zeilen werden an ihrer (season,
+year)-Position eingefügt, neue Kategorien hinten an die Wörterbücher
+gehängt (bestehende Codes bleiben gültig) und Listen sowie Zeilenbereiche
+fortgeschrieben. meta['delta'] beschreibt die eingefügten Zeilen, damit
+laufende Worker ihre Vorberechnungen nur ergänzen müssen.
+
+    python data_loader.py --append tokyo_2020.csv [--noc-regions noc_regions.csv]
+"""
+import argparse
+import contextlib
+import fcntl
+import gzip
+import hashlib
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from column_store import open_store, read_meta, write_store
+
+logger = logging.getLogger(__name__)
+
+# Erhöhen, sobald sich Layout oder Inhalt des Caches ändern – erzwingt einen Neubau
+CACHE_VERSION = 4
+
+# Pickle-Datei oder Roh-CSV (athlete_events.csv, dann mit noc_regions.csv daneben, siehe ingest.py)
+DATA_PATH = os.environ.get('ATHLETE_EVENTS_PATH', 'athlete_events.pkl.gz')
+NOC_REGIONS_PATH = os.environ.get('NOC_REGIONS_PATH')  # Standard: noc_regions.csv neben der Roh-CSV
+STORE_PATH = os.environ.get('ATHLETE_EVENTS_STORE', 'athlete_events.store')
+
+# Text-Spalten als Kategorien: ein gemeinsames Wörterbuch je Spalte, Zeilen halten nur Integer-Codes
+categorical_columns = ['season', 'region', 'sport', 'sex', 'medal', 'event', 'name', 'team', 'noc', 'games', 'city']
+
+
+def encode_categoricals(df):
+    return df.astype({c: 'category' for c in categorical_columns if c in df.columns})
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path, with_hash=True):
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['sha256'] = file_sha256(path)
+    return fingerprint
+
+
+def noc_regions_path(source):
+    """noc_regions.csv zur Roh-CSV source: NOC_REGIONS_PATH oder die Datei im selben Verzeichnis."""
+    return NOC_REGIONS_PATH or os.path.join(os.path.dirname(source), 'noc_regions.csv')
+
+
+def matches_fingerprint(cached, path):
+    # Gehasht wird nur, wenn mtime/Größe abweichen
+    current = source_fingerprint(path, with_hash=False)
+    if all(cached.get(k) == v for k, v in current.items()):
+        return True
+    return cached.get('sha256') == file_sha256(path)
+
+
+def is_fresh(meta, source, noc_regions=None):
+    """Prüft, ob der Cache zur Quelle (und bei einer Roh-CSV zu noc_regions) passt."""
+    if meta is None or meta.get('cache_version') != CACHE_VERSION:
+        return False
+    if not os.path.exists(source):
+        # Deployment ohne Pickle-Datei: der mitgelieferte Cache ist maßgeblich
+        return True
+    if not matches_fingerprint(meta.get('source', {}), source):
+        return False
+    if noc_regions is not None and os.path.exists(noc_regions):
+        return matches_fingerprint(meta.get('noc_regions', {}), noc_regions)
+    return True
+
+
+def build_options(athlete_events):
+    """Vorberechnete Dropdown-Listen (englische Werte, sortiert), Sportarten auch je Saison."""
+    season_sports = athlete_events[['season', 'sport']].dropna().drop_duplicates()
+    return {
+        'sports': sorted(athlete_events['sport'].cat.categories),
+        'regions': sorted(athlete_events['region'].cat.categories),
+        'sports_by_season': {
+            str(season): sorted(group['sport'].astype(str))
+            for season, group in season_sports.groupby('season', observed=True)
+        },
+        # Erstes und letztes Jahr – die Zeiträume im Dashboard wachsen mit
+        'years': [int(athlete_events['year'].min()), int(athlete_events['year'].max())],
+    }
+
+
+def sort_by_season_year(athlete_events):
+    """Sortiert nach (season, year) und liefert die Zeilenbereiche je Saison."""
+    athlete_events = athlete_events.sort_values(['season', 'year'], kind='stable').reset_index(drop=True)
+    codes = athlete_events['season'].cat.codes.values
+    partitions = {
+        str(season): [int(np.searchsorted(codes, code, 'left')), int(np.searchsorted(codes, code, 'right'))]
+        for code, season in enumerate(athlete_events['season'].cat.categories)
+    }
+    return athlete_events, partitions
+
+
+def rebuild_cache(source=DATA_PATH, store=STORE_PATH, noc_regions=None):
+    previous = read_meta(store)
+    if source.endswith('.csv'):
+        # Roh-CSV blockweise einlesen – der Speicher wächst mit Blockgröße und Wörterbüchern (siehe ingest.py)
+        from ingest import ingest_csv
+        ingest_csv(source, noc_regions or noc_regions_path(source), store)
+    else:
+        with gzip.open(source, 'rb') as f:
+            athlete_events = encode_categoricals(pickle.load(f))
+        athlete_events, partitions = sort_by_season_year(athlete_events)
+        write_store(athlete_events, store, extra_meta={
+            'cache_version': CACHE_VERSION,
+            'source': source_fingerprint(source),
+            'options': build_options(athlete_events),
+            'partitions': partitions,
+        })
+    # Angehängte Spiele stehen nicht in der Pickle-Datei – nach dem Neubau erneut anhängen
+    for entry in (previous or {}).get('appended', []):
+        try:
+            insert_games(entry['path'], store, entry.get('noc_regions'))
+        except (OSError, ValueError) as err:
+            logger.warning("Angehängte Spiele %s nicht übernommen: %s", entry['path'], err)
+
+
+@contextlib.contextmanager
+def store_lock(store):
+    # Prozessübergreifend: nur einer baut oder schreibt, die anderen warten
+    with open(f"{store}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def normalize_columns(df):
+    """Spaltennamen wie im Store: klein geschrieben, Leerzeichen als Unterstrich ('NOC' -> 'noc')."""
+    return df.rename(columns=lambda c: c.strip().lower().replace(' ', '_'))
+
+
+def read_noc_regions(path):
+    """noc_regions.csv als DataFrame mit den Spalten noc, region, notes."""
+    return normalize_columns(pd.read_csv(path)).drop_duplicates('noc')
+
+
+def read_games_csv(path, athlete_events, noc_regions=None):
+    """Eine Austragung als CSV im Schema von athlete_events.csv.
+
+    Fehlt die Spalte region, wird sie über noc_regions.csv oder – ohne die
+    Datei – über die NOC-Zuordnung der bereits gespeicherten Zeilen ergänzt.
+    """
+    games = normalize_columns(pd.read_csv(path))
+    if 'region' not in games.columns:
+        if noc_regions is not None:
+            regions = read_noc_regions(noc_regions)
+        else:
+            regions = athlete_events[['noc', 'region']].dropna().drop_duplicates('noc').astype(str)
+        games = games.merge(regions, on='noc', how='left', suffixes=('', '_noc'))
+    return games
+
+
+def insert_games(csv_path, store=STORE_PATH, noc_regions=None):
+    """Fügt die Zeilen einer Austragung als neue Store-Version ein (Aufrufer hält store_lock)."""
+    meta = read_meta(store)
+    if meta is None:
+        raise FileNotFoundError(f"Kein Store unter {store}")
+    athlete_events = open_store(store)
+    games = read_games_csv(csv_path, athlete_events, noc_regions)
+    keys = games[['season', 'year']].drop_duplicates()
+    if len(keys) != 1:
+        raise ValueError(f"{csv_path}: genau eine Austragung (Saison, Jahr) erwartet, gefunden {len(keys)}")
+    season, year = str(keys['season'].iloc[0]), int(keys['year'].iloc[0])
+
+    # Einfügeposition: hinter dem letzten Jahr <= year der Saison, neue Saisons ans Ende
+    rows, added = len(athlete_events), len(games)
+    lo, hi = meta['partitions'].get(season, [rows, rows])
+    season_years = athlete_events['year'].values[lo:hi]
+    start = lo + int(np.searchsorted(season_years, year, 'right'))
+    if start > lo and season_years[start - lo - 1] == year:
+        raise ValueError(f"{csv_path}: {season} {year} ist bereits im Store")
+
+    columns = {}
+    for name in athlete_events.columns:
+        old = athlete_events[name]
+        values = games[name] if name in games.columns else pd.Series(np.nan, index=games.index)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            values = values.where(values.isna(), values.astype(str))
+            # Neue Werte hinten anhängen: die Codes der vorhandenen Zeilen ändern sich nicht
+            categories = old.cat.categories.append(pd.Index(sorted(set(values.dropna()) - set(old.cat.categories))))
+            codes = pd.Categorical(values, categories=categories).codes
+            old_codes = old.cat.codes.values
+            merged = np.concatenate([old_codes[:start], codes, old_codes[start:]])
+            columns[name] = pd.Categorical.from_codes(merged, categories=categories)
+        else:
+            new_values = pd.to_numeric(values, errors='coerce').to_numpy()
+            dtype = np.result_type(old.dtype, new_values.dtype)
+            columns[name] = np.concatenate([old.values[:start], new_values, old.values[start:]]).astype(dtype)
+    merged = pd.DataFrame(columns, copy=False)
+
+    partitions = {}
+    for name, (a, b) in meta['partitions'].items():
+        if name == season:
+            partitions[name] = [a, b + added]
+        else:
+            partitions[name] = [a + added, b + added] if a >= hi else [a, b]
+    partitions.setdefault(season, [start, start + added])
+
+    options = meta['options']
+    new_sports = set(games['sport'].dropna().astype(str))
+    extra_meta = {k: v for k, v in meta.items() if k not in ('format', 'version', 'rows', 'columns')}
+    extra_meta.update(
+        options={
+            'sports': sorted(set(options['sports']) | new_sports),
+            'regions': sorted(set(options['regions']) | set(games['region'].dropna().astype(str))),
+            'sports_by_season': dict(
+                options['sports_by_season'],
+                **{season: sorted(set(options['sports_by_season'].get(season, [])) | new_sports)}
+            ),
+            'years': [min(options['years'][0], year), max(options['years'][1], year)],
+        },
+        partitions=partitions,
+        delta={'base_version': meta.get('version'), 'start': start, 'rows': added},
+        appended=meta.get('appended', []) + [{
+            'path': os.path.abspath(csv_path),
+            'noc_regions': os.path.abspath(noc_regions) if noc_regions else None,
+            'games': f"{year} {season}",
+            'rows': added,
+            'sha256': file_sha256(csv_path),
+        }],
+    )
+    write_store(merged, store, extra_meta=extra_meta)
+
+
+def append_games(csv_path, store=STORE_PATH, noc_regions=None):
+    """Hängt eine Austragung an; laufende Worker übernehmen die neue Version beim nächsten Request."""
+    with store_lock(store):
+        insert_games(csv_path, store, noc_regions)
+    return read_meta(store)
+
+
+def load_dataset(source=DATA_PATH, store=STORE_PATH):
+    """Liefert (athlete_events, meta); baut den Cache bei Bedarf genau einmal neu."""
+    noc_regions = noc_regions_path(source) if source.endswith('.csv') else None
+    meta = read_meta(store)
+    if not is_fresh(meta, source, noc_regions):
+        # Mehrere Worker starten gleichzeitig – nur einer baut, die anderen warten und lesen
+        with store_lock(store):
+            meta = read_meta(store)
+            if not is_fresh(meta, source, noc_regions):
+                rebuild_cache(source, store, noc_regions)
+    # Link einmal auflösen: Daten und Metadaten derselben Version, auch wenn gerade getauscht wird
+    version_path = os.path.realpath(store)
+    return open_store(version_path), read_meta(version_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Spalten-Cache neu bauen oder eine Austragung anhängen.')
+    parser.add_argument('--append', metavar='CSV', help='Zeilen einer Austragung (Schema wie athlete_events.csv)')
+    parser.add_argument('--noc-regions', metavar='CSV', help='NOC -> Region für CSVs ohne Spalte region')
+    args = parser.parse_args()
+    if args.append:
+        meta = append_games(args.append, noc_regions=args.noc_regions)
+        print(f"{meta['appended'][-1]['games']}: {meta['delta']['rows']} Zeilen angehängt, Version {meta['version']}")
+    else:
+        rebuild_cache()
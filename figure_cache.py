@@ -0,0 +1,263 @@
+"""Memoisierung der Chart-Callbacks.
+
+Der Eingaberaum der Callbacks ist klein und endlich (Zeitraum × Saison ×
+Land × Sportart × Geschlecht), der Großteil der Anfragen trifft dieselben
+Defaults. Figuren werden daher einmal als JSON serialisiert und in einem
+LRU-Cache mit fester Obergrenze in Bytes abgelegt.
+
+Optional liegt dahinter ein zweiter, mit allen Workern eines Hosts geteilter
+Speicher (SQLite-Datei, kein externer Dienst nötig): eine Figur, die ein
+Worker berechnet hat, liefern die anderen direkt aus.
+"""
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+
+class FigureCache:
+    """LRU-Cache für serialisierte Figuren, begrenzt über die Summe der JSON-Längen."""
+
+    def __init__(self, max_bytes=64 * 2**20, shared=None, request_log=None, metrics=None):
+        self.max_bytes = max_bytes
+        self.shared = shared  # optional: SharedResultStore
+        self.request_log = request_log  # optional: Pfad, jede Anfrage als JSON-Zeile (für warmup.py)
+        self.metrics = metrics  # optional: metrics.Metrics, Treffer/Fehlschläge je Funktion
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.memoized = {}  # Name -> memoisierte Funktion, z. B. für das Vorwärmen
+        self.generation = 0  # zählt clear() – Ergebnisse von davor begonnenen Berechnungen verfallen
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._log_file = None
+        self._log_pid = None
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.shared_hits += 1
+                self._put_local(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value, namespace=None):
+        self._put_local(key, value)
+        if self.shared is not None:
+            self.shared.put(key, value, namespace)
+
+    def _put_local(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        """Verwirft alle lokalen Einträge, z. B. nach einem neuen Datenstand."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    def log_request(self, name, args):
+        # Kleine Zeilen im Append-Modus – mehrere Worker können dieselbe Datei beschreiben
+        if self._log_file is None or self._log_pid != os.getpid():
+            self._log_file = open(self.request_log, 'a', buffering=1, encoding='utf-8')
+            self._log_pid = os.getpid()
+        self._log_file.write(json.dumps({'name': name, 'args': args}, ensure_ascii=False) + '\n')
+
+    def stats(self):
+        with self._lock:
+            stats = {'hits': self.hits, 'shared_hits': self.shared_hits, 'misses': self.misses,
+                     'entries': len(self._entries), 'bytes': self._bytes}
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats()
+        return stats
+
+    def memoize(self, name, key=None):
+        """Dekorator: Ergebnis (go.Figure oder Dash-Komponente) je normalisiertem Schlüssel cachen.
+
+        key bildet die Callback-Argumente auf einen hashbaren, normalisierten
+        Schlüssel ab (Standard: die Argumente selbst).
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                normalized = tuple(key(*args) if key else args)
+                if self.request_log:
+                    self.log_request(name, normalized)
+                cache_key = (name,) + normalized
+                cached = self.get(cache_key)
+                if self.metrics is not None:
+                    self.metrics.cache_lookup(name, cached is not None)
+                if cached is None:
+                    # Datenstand beim Start merken: das Ergebnis gehört zu diesem Namensraum, nicht zu
+                    # dem, der beim Ablegen gerade gilt
+                    generation = self.generation
+                    namespace = self.shared.namespace if self.shared is not None else None
+                    cached = to_json_plotly(func(*args))
+                    # Während der Berechnung kam ein neuer Datenstand: Ergebnis nicht mehr ablegen
+                    if generation == self.generation:
+                        self.put(cache_key, cached, namespace)
+                return json.loads(cached)
+            self.memoized[name] = wrapper
+            return wrapper
+        return decorator
+
+
+class SharedResultStore:
+    """Mit allen Workern geteilter Ergebnis-Speicher in einer SQLite-Datei.
+
+    Einträge verfallen nach ttl Sekunden; wächst die Datei über max_bytes,
+    werden die am längsten nicht gelesenen Einträge verdrängt. Fehler (z. B.
+    gesperrte Datenbank) gelten als Cache-Miss – eine Anfrage scheitert nie
+    am Cache. namespace trennt Einträge verschiedener Datenstände.
+    """
+
+    # Größenprüfung nur bei jedem n-ten Schreiben, nicht bei jedem
+    EVICT_EVERY = 50
+    # Zugriffszeiten gesammelt nachtragen – spätestens nach so vielen Treffern (ohne auf die Sperre zu warten)
+    ACCESS_FLUSH_EVERY = 100
+    BUSY_TIMEOUT_MS = 1000
+
+    def __init__(self, path, ttl=3600, max_bytes=256 * 2**20, namespace=''):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self._conn = None
+        self._pid = None
+        self._puts = 0
+        self._accessed = {}  # Schlüssel -> letzter Treffer, noch nicht in der Datei
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        # SQLite-Verbindungen überleben keinen fork – pro Prozess neu öffnen
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _key(self, key, namespace=None):
+        return json.dumps([self.namespace if namespace is None else namespace, key], ensure_ascii=False)
+
+    def get(self, key):
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    'SELECT value FROM results WHERE key = ? AND created > ?', (self._key(key), now - self.ttl)
+                ).fetchone()
+                if row is None:
+                    return None
+                # Ein Lesezugriff schreibt nicht: die Zugriffszeit wird gesammelt und später nachgetragen
+                self._accessed[self._key(key)] = now
+                if len(self._accessed) >= self.ACCESS_FLUSH_EVERY:
+                    self._flush_accessed(conn, wait=False)
+        except sqlite3.Error:
+            return None
+        return row[0]
+
+    def _flush_accessed(self, conn, wait=True):
+        """Gesammelte Zugriffszeiten schreiben; ohne wait nur, wenn die Datei gerade frei ist."""
+        if not self._accessed:
+            return
+        if not wait:
+            conn.execute('PRAGMA busy_timeout = 0')
+        try:
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(
+                    'UPDATE results SET accessed = MAX(accessed, ?) WHERE key = ?',
+                    [(accessed, key) for key, accessed in self._accessed.items()]
+                )
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                conn.execute('ROLLBACK')
+                raise
+            self._accessed.clear()
+        except sqlite3.Error:
+            if wait:
+                raise
+            # Gesperrt: beim nächsten Schreiben oder Treffer erneut versuchen
+        finally:
+            if not wait:
+                conn.execute(f'PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}')
+
+    def put(self, key, value, namespace=None):
+        """Legt value ab – unter namespace, falls angegeben (Datenstand, aus dem value berechnet wurde)."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (self._key(key, namespace), value, len(value), now, now)
+                )
+                self._flush_accessed(conn)
+                self._puts += 1
+                if self._puts % self.EVICT_EVERY == 0:
+                    self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn, now):
+        conn.execute('DELETE FROM results WHERE created <= ?', (now - self.ttl,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Älteste Zugriffe zuerst, bis wieder unter der Grenze (mit etwas Luft)
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM results ORDER BY accessed').fetchall():
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.execute('BEGIN')
+        conn.executemany('DELETE FROM results WHERE key = ?', victims)
+        conn.execute('COMMIT')
+
+    def stats(self):
+        try:
+            with self._lock:
+                entries, size = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+                ).fetchone()
+        except sqlite3.Error:
+            return {}
+        return {'entries': entries, 'bytes': size}
@@ -0,0 +1,63 @@
+"""Teilaktualisierung der Chart-Figuren per dash.Patch.
+
+Meist ändern sich bei einer Dropdown-Änderung nur die Werte der Traces und
+der Titel, nicht Aufbau, Farben, Achsen oder Vorlage. Jede Figur bekommt
+daher eine Struktur-Signatur (Hash über alles außer Werten und Titel), die
+der Browser in einem dcc.Store hält; stimmt sie mit der neuen Figur überein,
+gehen nur Werte und Titel als Patch raus statt der kompletten Figur.
+"""
+import functools
+import hashlib
+import json
+
+import dash
+
+# Trace-Schlüssel, die nur Werte tragen – alles andere gehört zur Struktur
+VALUE_KEYS = ('x', 'y', 'z', 'text')
+
+
+def structure_signature(figure):
+    """Hash über die Figur ohne Trace-Werte und Titeltext (Schlüssel bleiben enthalten)."""
+    layout = dict(figure.get('layout', {}))
+    if isinstance(layout.get('title'), dict):
+        layout['title'] = dict(layout['title'], text=None)
+    structure = {
+        'data': [{k: (None if k in VALUE_KEYS else v) for k, v in trace.items()} for trace in figure.get('data', [])],
+        'layout': layout,
+    }
+    return hashlib.sha1(json.dumps(structure, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def patch_figure(figure, previous_signature):
+    """(Figur oder Patch, Signatur): Patch nur mit Werten und Titel, wenn die Struktur gleich blieb."""
+    signature = structure_signature(figure)
+    if signature != previous_signature:
+        return figure, signature
+    patch = dash.Patch()
+    for i, trace in enumerate(figure.get('data', [])):
+        for key in VALUE_KEYS:
+            if key in trace:
+                patch['data'][i][key] = trace[key]
+    title = figure.get('layout', {}).get('title')
+    if isinstance(title, dict) and 'text' in title:
+        patch['layout']['title']['text'] = title['text']
+    return patch, signature
+
+
+def with_figure_patch(func):
+    """Callback-Wrapper: letzte Eingabe ist die bisherige Signatur, zusätzliche letzte Ausgabe die neue.
+
+    Die Figur ist die (erste) Ausgabe von func als Dict, wie es FigureCache.memoize liefert.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        *args, previous_signature = args
+        result = func(*args)
+        multi = isinstance(result, tuple)
+        figure = result[0] if multi else result
+        if figure is dash.no_update:
+            signature = dash.no_update
+        else:
+            figure, signature = patch_figure(figure, previous_signature)
+        return (figure,) + result[1:] + (signature,) if multi else (figure, signature)
+    return wrapper
@@ -0,0 +1,203 @@
+"""Spalten-Store direkt aus den Roh-CSVs (athlete_events.csv, noc_regions.csv).
+
+Reproduzierbarer Ersatz für die vorgebaute Pickle-Datei:
+
+    python ingest.py data/athlete_events.csv data/noc_regions.csv
+
+Die CSV wird in Blöcken von --chunk-rows Zeilen gelesen; jeder Block wird
+normalisiert (Spaltennamen wie im Store, NOC -> Region aus noc_regions.csv),
+seine Text-Spalten über wachsende Wörterbücher in Integer-Codes übersetzt
+und die Zeilen je (season, year) in Spill-Dateien angehängt. Danach werden
+die Spalten Austragung für Austragung in sortierter Reihenfolge in die
+Memory-Maps des Stores kopiert und die Codes auf alphabetisch sortierte
+Kategorien umgestellt – das Ergebnis entspricht dem Store aus der
+Pickle-Datei (nach (season, year) sortiert, gleiche Optionen und Bereiche).
+
+Der Speicherbedarf hängt von der Blockgröße und der Zahl verschiedener Werte
+(Wörterbücher) ab. Für Saison, Sportart, Region usw. ist das klein; name
+hat aber fast so viele Werte wie Athleten, dieses Wörterbuch wächst also
+mit dem Datensatz – die Zeilen selbst liegen nie vollständig im Speicher.
+Mit ATHLETE_EVENTS_PATH auf einer .csv baut auch das Dashboard seinen Cache
+auf diesem Weg; ein geändertes noc_regions.csv löst ebenfalls einen Neubau aus.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from column_store import StoreWriter
+from data_loader import (
+    CACHE_VERSION, STORE_PATH, normalize_columns, read_noc_regions, source_fingerprint, store_lock
+)
+
+# Zahlen-Spalten von athlete_events.csv; alle übrigen Spalten werden kategorisch
+NUMERIC_COLUMNS = {'id': np.int64, 'age': np.float64, 'height': np.float64, 'weight': np.float64, 'year': np.int64}
+CHUNK_ROWS = 100_000
+
+
+def code_dtype(n_categories):
+    # Wie pandas: kleinster Integer-Typ, der alle Codes (und -1 für fehlend) fasst
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class Dictionary:
+    """Wert -> Code in der Reihenfolge des ersten Auftretens."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, column):
+        codes, uniques = pd.factorize(column)
+        # Letzter Eintrag -1: factorize liefert -1 für fehlende Werte, die so -1 bleiben
+        lookup = np.full(len(uniques) + 1, -1, dtype=np.int32)
+        for i, value in enumerate(uniques):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            lookup[i] = code
+        return lookup[codes]
+
+    def sorted_remap(self):
+        """(alphabetisch sortierte Kategorien, alter Code -> neuer Code)."""
+        order = sorted(range(len(self.values)), key=self.values.__getitem__)
+        remap = np.empty(len(order) + 1, dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        remap[-1] = -1  # Index -1 bildet fehlende Werte auf sich selbst ab
+        return [self.values[i] for i in order], remap
+
+
+def read_chunks(csv_path, noc_regions, chunk_rows):
+    """Normalisierte Blöcke von athlete_events.csv, Region und Notizen aus noc_regions angefügt."""
+    # Text-Spalten immer als str lesen – sonst rät pandas je Block (z. B. float für leere Spalten)
+    original = pd.read_csv(csv_path, nrows=0).columns
+    names = normalize_columns(pd.DataFrame(columns=original)).columns
+    dtypes = {raw: (np.float64 if name in NUMERIC_COLUMNS else str) for raw, name in zip(original, names)}
+    regions = read_noc_regions(noc_regions).set_index('noc')
+    for chunk in pd.read_csv(csv_path, dtype=dtypes, chunksize=chunk_rows):
+        chunk = normalize_columns(chunk)
+        # Left Join über die NOC wie merge(..., how='left'): unbekannte NOC ohne Region
+        for column in regions.columns:
+            if column not in chunk.columns:
+                chunk[column] = chunk['noc'].map(regions[column])
+        yield chunk
+
+
+def ingest_csv(csv_path, noc_regions, store=STORE_PATH, chunk_rows=CHUNK_ROWS, spill_dir=None):
+    """Baut eine neue Store-Version aus den Roh-CSVs; liefert die Zeilenzahl."""
+    spill = tempfile.mkdtemp(prefix='ingest-', dir=spill_dir)
+    try:
+        dictionaries = {}
+        columns = None
+        buckets = {}  # (season-Code, Jahr) -> Zeilen
+        season_sports = set()
+        for chunk in read_chunks(csv_path, noc_regions, chunk_rows):
+            if columns is None:
+                columns = list(chunk.columns)
+                dictionaries = {c: Dictionary() for c in columns if c not in NUMERIC_COLUMNS}
+            values = {}
+            for name in columns:
+                if name in NUMERIC_COLUMNS:
+                    values[name] = chunk[name].to_numpy(dtype=np.float64)
+                    if NUMERIC_COLUMNS[name] is np.int64:
+                        if np.isnan(values[name]).any():
+                            raise ValueError(f"{csv_path}: fehlende Werte in der Ganzzahl-Spalte {name}")
+                        values[name] = values[name].astype(np.int64)
+                else:
+                    values[name] = dictionaries[name].encode(chunk[name])
+            if (values['season'] < 0).any():
+                raise ValueError(f"{csv_path}: Zeilen ohne Saison")
+            pairs = np.unique(np.stack([values['season'], values['sport']], axis=1), axis=0)
+            season_sports.update(map(tuple, pairs.tolist()))
+
+            # Zeilen je (season, year) an ihre Spill-Dateien anhängen (stabile Reihenfolge innerhalb)
+            keys = values['season'].astype(np.int64) * 10_000 + values['year']
+            order = np.argsort(keys, kind='stable')
+            unique, starts = np.unique(keys[order], return_index=True)
+            for key, rows in zip(unique.tolist(), np.split(order, starts[1:])):
+                bucket = divmod(key, 10_000)
+                buckets[bucket] = buckets.get(bucket, 0) + len(rows)
+                directory = os.path.join(spill, f"{bucket[0]}_{bucket[1]}")
+                os.makedirs(directory, exist_ok=True)
+                for name in columns:
+                    with open(os.path.join(directory, name), 'ab') as f:
+                        values[name][rows].tofile(f)
+        if columns is None:
+            raise ValueError(f"{csv_path}: keine Zeilen")
+
+        # Kategorien alphabetisch sortieren (wie astype('category')) und Codes umschlüsseln
+        categories, remaps = {}, {}
+        for name, dictionary in dictionaries.items():
+            categories[name], remaps[name] = dictionary.sorted_remap()
+        season_order = remaps['season']
+        # Reihenfolge im Store: nach sortiertem Saison-Code, dann Jahr
+        ordered = sorted(buckets, key=lambda b: (season_order[b[0]], b[1]))
+        rows = sum(buckets.values())
+
+        writer = StoreWriter(store)
+        targets = {}
+        for name in columns:
+            if name in NUMERIC_COLUMNS:
+                targets[name] = writer.open_column(name, NUMERIC_COLUMNS[name], rows)
+            else:
+                dtype = code_dtype(len(categories[name]))
+                targets[name] = writer.open_column(name, dtype, rows, categories[name])
+        partitions = {}
+        position = 0
+        for bucket in ordered:
+            size = buckets[bucket]
+            directory = os.path.join(spill, f"{bucket[0]}_{bucket[1]}")
+            for name in columns:
+                data = np.fromfile(os.path.join(directory, name), dtype=NUMERIC_COLUMNS.get(name, np.int32))
+                targets[name][position:position + size] = data if name in NUMERIC_COLUMNS else remaps[name][data]
+            season = categories['season'][season_order[bucket[0]]]
+            lo, _ = partitions.get(season, [position, position])
+            partitions[season] = [lo, position + size]
+            position += size
+        for target in targets.values():
+            target.flush()
+        del targets
+
+        sport_labels = categories['sport']
+        by_season = {}
+        for season, sport in season_sports:
+            if sport >= 0:
+                by_season.setdefault(categories['season'][season_order[season]], set()).add(
+                    sport_labels[remaps['sport'][sport]]
+                )
+        years = [bucket[1] for bucket in buckets]
+        writer.commit(rows, extra_meta={
+            'cache_version': CACHE_VERSION,
+            'source': source_fingerprint(csv_path),
+            'noc_regions': source_fingerprint(noc_regions),
+            'options': {
+                'sports': sport_labels,
+                'regions': categories['region'],
+                'sports_by_season': {season: sorted(sports) for season, sports in sorted(by_season.items())},
+                'years': [min(years), max(years)],
+            },
+            'partitions': partitions,
+        })
+        return rows
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('athlete_events', help='athlete_events.csv')
+    parser.add_argument('noc_regions', help='noc_regions.csv')
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--spill-dir', help='Verzeichnis für Zwischendateien (Standard: temporär)')
+    args = parser.parse_args()
+    with store_lock(args.store):
+        rows = ingest_csv(args.athlete_events, args.noc_regions, args.store, args.chunk_rows, args.spill_dir)
+    print(f"{rows} Zeilen nach {args.store}")
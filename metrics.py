@@ -0,0 +1,127 @@
+"""Laufzeit-Metriken der Dash-Callbacks im Prometheus-Textformat.
+
+Aktiviert wird das Ganze im Dashboard per METRICS_ENABLED; ohne die
+Variable wird nichts registriert und kein Callback umhüllt. Aktiv misst ein
+before/after_request-Paar jeden Aufruf von /_dash-update-component
+(Wandzeit als Histogramm je Callback-Funktion), die Rechenfunktionen melden
+die gelesenen Zeilen bzw. Zellen der Vorberechnungen, und der Figuren-Cache
+meldet Treffer und Fehlschläge je memoisierter Funktion.
+
+Die Werte gelten je Prozess – bei mehreren gunicorn-Workern liefert
+/metrics die Zahlen des Workers, der die Anfrage beantwortet.
+"""
+import threading
+import time
+from collections import defaultdict
+
+import flask
+
+# Obergrenzen der Latenz-Buckets in Sekunden
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DASH_UPDATE_PATH = '/_dash-update-component'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.latency = {}  # Callback -> Histogram
+        self.responses = defaultdict(int)  # (Callback, Status) -> Anzahl
+        self.rows = defaultdict(int)  # Callback -> gelesene Zeilen/Zellen
+        self.cache = defaultdict(int)  # (Funktion, hit|miss) -> Anzahl
+        self._lock = threading.Lock()
+        self._callback_names = {}
+
+    def instrument(self, app):
+        """Hängt die Messung an app.server und stellt /metrics bereit."""
+        server = app.server
+        for spec, callback in app.callback_map.items():
+            if 'callback' in callback:
+                self._callback_names[spec] = callback['callback'].__name__
+
+        @server.before_request
+        def start_timer():
+            if flask.request.path == DASH_UPDATE_PATH:
+                flask.g.metrics_start = time.perf_counter()
+                flask.g.metrics_rows = 0
+
+        @server.after_request
+        def record(response):
+            start = flask.g.pop('metrics_start', None)
+            if start is not None:
+                body = flask.request.get_json(silent=True) or {}
+                name = self._callback_names.get(body.get('output'), 'unknown')
+                self.observe(name, time.perf_counter() - start, response.status_code, flask.g.pop('metrics_rows', 0))
+            return response
+
+        @server.route('/metrics')
+        def prometheus_metrics():
+            return flask.Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def observe(self, callback, seconds, status, rows):
+        with self._lock:
+            if callback not in self.latency:
+                self.latency[callback] = Histogram(self.buckets)
+            self.latency[callback].observe(seconds)
+            self.responses[(callback, status)] += 1
+            self.rows[callback] += rows
+
+    def count_rows(self, rows):
+        """Von den Rechenfunktionen aufgerufen: gelesene Zeilen der laufenden Anfrage."""
+        if flask.has_request_context() and 'metrics_rows' in flask.g:
+            flask.g.metrics_rows += int(rows)
+
+    def cache_lookup(self, function, hit):
+        with self._lock:
+            self.cache[(function, 'hit' if hit else 'miss')] += 1
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP dash_callback_duration_seconds Wandzeit je Dash-Callback (Server-Seite).',
+                '# TYPE dash_callback_duration_seconds histogram',
+            ]
+            for callback, histogram in sorted(self.latency.items()):
+                lines += histogram.lines('dash_callback_duration_seconds', f'callback="{callback}"')
+            lines += [
+                '# HELP dash_callback_responses_total Antworten je Dash-Callback und HTTP-Status.',
+                '# TYPE dash_callback_responses_total counter',
+            ]
+            lines += [f'dash_callback_responses_total{{callback="{c}",status="{s}"}} {n}'
+                      for (c, s), n in sorted(self.responses.items())]
+            lines += [
+                '# HELP dash_callback_rows_scanned_total Gelesene Zeilen bzw. Zellen der Vorberechnungen.',
+                '# TYPE dash_callback_rows_scanned_total counter',
+            ]
+            lines += [f'dash_callback_rows_scanned_total{{callback="{c}"}} {n}' for c, n in sorted(self.rows.items())]
+            lines += [
+                '# HELP figure_cache_lookups_total Nachschläge im Figuren-Cache je Funktion.',
+                '# TYPE figure_cache_lookups_total counter',
+            ]
+            lines += [f'figure_cache_lookups_total{{function="{f}",result="{r}"}} {n}'
+                      for (f, r), n in sorted(self.cache.items())]
+        return '\n'.join(lines) + '\n'
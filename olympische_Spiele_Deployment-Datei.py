@@ -1,9 +1,25 @@
-import pandas as pd
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
 import plotly.graph_objects as go
 import dash
-from dash import dcc, html, Input, Output
-import gzip
-import pickle
+from dash import dcc, html, ClientsideFunction, Input, Output, State
+
+from aggregates import (
+    HeatmapTensor, YearPrefixSums, build_medal_cube, build_sport_facts, compact_medal_aggregate, merge_medal_cubes,
+    slice_medal_cube
+)
+from column_store import current_version
+from data_loader import STORE_PATH, load_dataset
+from figure_cache import FigureCache, SharedResultStore
+from figure_patch import patch_figure, with_figure_patch
+from metrics import Metrics
+from profiling import CallbackProfiler
+from warmup import top_requests, warm_up
 
 # Dash initialisieren
 app = dash.Dash(__name__)
@@ -11,19 +27,84 @@ server = app.server
 
 # Farben & Zeiträume
 medal_colors = {'Gold': '#FFD700', 'Silver': '#C0C0C0', 'Bronze': '#CD7F32', 'Alle': '#8888FF'}
-time_periods = {
-    'Gesamt (1896–2016)': (1896, 2016),
-    '1896–1936': (1896, 1936),
-    '1948–1992': (1948, 1992),
-    '1994–2016': (1994, 2016)
-}
 
-# Pickle-Datei laden (komprimiert)
-with gzip.open("athlete_events.pkl.gz", "rb") as f:
-    athlete_events = pickle.load(f)
+# Zählweisen der Charts: jede Athleten-Zeile eine Medaille (Fußball-Gold = ganze Mannschaft) oder
+# Medaillenspiegel (eine Medaille je Austragung, Wettbewerb, Land und Medaille); beide vorberechnet
+count_modes = {'athletes': '🧍 Medaillen je Athlet', 'table': '🏅 Medaillenspiegel (Team = 1)'}
+
+# Unbekannte Zählweise wie die Standard-Zählweise behandeln
+def count_mode(mode):
+    return mode if mode in count_modes else 'athletes'
+
+# Titel-Zusatz: nur der Medaillenspiegel wird eigens ausgewiesen
+def count_mode_suffix(mode):
+    return ' – Medaillenspiegel' if count_mode(mode) == 'table' else ''
+
+# 'Gesamt' und der letzte Zeitraum reichen bis zum letzten Jahr im Datensatz (angehängte Spiele)
+def build_time_periods(first_year, last_year):
+    first, last = min(first_year, 1896), max(last_year, 2016)
+    return {
+        f'Gesamt ({first}–{last})': (first, last),
+        '1896–1936': (1896, 1936),
+        '1948–1992': (1948, 1992),
+        f'1994–{last}': (1994, last)
+    }
+
+# Titel-Zusatz für einen Jahresbereich: Name des Zeitraums, falls es einer der festen ist
+def period_label(time_periods, start, end):
+    for name, bounds in time_periods.items():
+        if bounds == (start, end):
+            return name
+    return f"{start}–{end}"
+
+# Slider-Wert [von, bis] als hashbarer Cache-Schlüssel
+def normalize_years(years):
+    return tuple(int(y) for y in years)
+
+# Wert -> Integer-Code einer kategorischen Spalte
+def category_codes(events, column):
+    return {value: code for code, value in enumerate(events[column].cat.categories)}
+
+# Datensatz aus dem Spalten-Cache laden (per Memory-Map, von allen Workern geteilt);
+# der Cache wird aus athlete_events.pkl.gz neu gebaut, wenn er fehlt oder veraltet ist
+athlete_events, dataset_meta = load_dataset()
+
+# Ergebnis-Cache: LRU pro Worker (serialisiertes JSON), Obergrenze in MB per Umgebungsvariable.
+# Mit SHARED_CACHE_PATH zusätzlich eine SQLite-Datei, die sich alle Worker des Hosts teilen;
+# der Namensraum aus Datenstand und App-Code verhindert, dass nach einem Deploy alte Figuren kommen.
+def cache_namespace(meta):
+    return f"{meta.get('source', {}).get('sha256', '')[:12]}-{meta.get('version')}-{code_hash}"
+
+shared_cache = None
+if os.environ.get('SHARED_CACHE_PATH'):
+    with open(__file__, 'rb') as f:
+        code_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+    shared_cache = SharedResultStore(
+        os.environ['SHARED_CACHE_PATH'],
+        ttl=int(os.environ.get('SHARED_CACHE_TTL', '3600')),
+        max_bytes=int(os.environ.get('SHARED_CACHE_MB', '256')) * 2**20,
+        namespace=cache_namespace(dataset_meta)
+    )
+# Prometheus-Metriken unter /metrics nur mit METRICS_ENABLED – sonst wird nichts gemessen
+metrics = Metrics() if os.environ.get('METRICS_ENABLED') else None
+figure_cache = FigureCache(
+    max_bytes=int(os.environ.get('FIGURE_CACHE_MB', '64')) * 2**20,
+    shared=shared_cache,
+    request_log=os.environ.get('REQUEST_LOG_PATH'),
+    metrics=metrics
+)
+# Optionaler clientseitiger Modus: Einzel- und Ländervergleich filtert und zeichnet der Browser
+# (assets/clientside_charts.js) aus einem einmal mitgeschickten Saison-Aggregat – ohne Server-Roundtrip
+clientside_charts = bool(os.environ.get('CLIENTSIDE_CHARTS'))
+# Schwere Ansichten optional als Dash-Hintergrund-Callbacks in eigenen Prozessen (DiskcacheManager,
+# kein externer Broker): BACKGROUND_CALLBACKS z. B. 'heatmap,sportart-fakten'.
+# Benötigt pip install "dash[diskcache]"; mit SHARED_CACHE_PATH teilen Jobs und Worker ihre Ergebnisse.
+background_views = {v.strip() for v in os.environ.get('BACKGROUND_CALLBACKS', '').split(',') if v.strip()}
+background_manager = None
+if background_views:
+    import diskcache
+    background_manager = dash.DiskcacheManager(diskcache.Cache(os.environ.get('BACKGROUND_CACHE_DIR', 'background-cache')))
 
-# Sportarten-Übersetzung (alle aus dem Datensatz)
-unique_sports_en = sorted(athlete_events['sport'].dropna().unique())
 # Individuelle Übersetzung aller Sportarten – bitte ggf. ergänzen/überarbeiten!
 sport_translation = {
     'Alpinism': 'Alpinismus',
@@ -228,98 +309,300 @@ country_translation = {
 }
 country_translation_de_to_en = {v: k for k, v in country_translation.items()}
 
-# Sportarten und Länder auf Deutsch für Dropdowns
-unique_sports_de = [sport_translation.get(s, s) for s in unique_sports_en]
-sport_options = [{'label': '🏆 Alle Sportarten', 'value': 'Alle'}] + [
-    {'label': de, 'value': de} for de in unique_sports_de
-]
-unique_countries_en = sorted(athlete_events['region'].dropna().unique())
-unique_countries_de = [country_translation.get(c, c) for c in unique_countries_en]
-region_options = [{'label': de, 'value': de} for de in unique_countries_de]
-
-app.layout = html.Div([
-    html.H1("🏅 Olympische Spiele Dashboard", style={'textAlign': 'center'}),
-    html.Div([
-        html.Label("Zeitraum:"),
-        dcc.Dropdown(
-            id='period-dropdown',
-            options=[{'label': k, 'value': k} for k in time_periods],
-            value='Gesamt (1896–2016)'
-        ),
-        html.Label("Saison:"),
-        dcc.Dropdown(
-            id='season-dropdown',
-            options=[{'label': '☀️ Sommer', 'value': 'Summer'}, {'label': '❄️ Winter', 'value': 'Winter'}],
-            value='Summer'
-        ),
-        html.Label("Land (einzeln):"),
-        dcc.Dropdown(id='country-dropdown', options=region_options, value='Deutschland'),
-        html.Label("Sportart:"),
-        dcc.Dropdown(id='sport-dropdown', options=sport_options, value='Alle'),
-        html.Label("Geschlecht:"),
+# Sportarten-Optionen je Saison einmal vorberechnen: (Optionen, Default für die Fakten-Auswahl).
+# Die Tupel werden bei jedem Saisonwechsel unverändert zurückgegeben und nie verändert.
+def build_season_sport_options(sports_en):
+    sports_de = [sport_translation.get(s, s) for s in sports_en]
+    options = ({'label': '🏆 Alle Sportarten', 'value': 'Alle'},) + tuple(
+        {'label': de, 'value': de} for de in sports_de
+    )
+    return options, (sports_de[0] if sports_de else 'Alle')
+
+no_season_sport_options = build_season_sport_options([])
+
+# Alles, was die JS-Funktionen brauchen: Würfel je Saison plus Code-Tabellen und Layout-Vorlage
+def clientside_aggregate(d):
+    seasons = compact_medal_aggregate(d.medal_cubes['athletes'], d.medal_cubes['table'])
+    payload = {
+        'seasons': {},
+        'no_sport_options': list(no_season_sport_options[0]),
+        'region_codes': d.region_codes_de,
+        'sport_codes': d.sport_codes_de,
+        'sex_codes': d.sex_codes,
+        'medal_labels': d.medal_labels.tolist(),
+        'medal_colors': medal_colors,
+        'time_periods': {name: list(bounds) for name, bounds in d.time_periods.items()},
+        # Gleiche Plotly-Vorlage wie die serverseitigen Figuren
+        'template': json.loads(go.Figure().to_json())['layout']['template'],
+    }
+    for season, code in d.season_codes.items():
+        payload['seasons'][season] = dict(
+            seasons.get(code, {c: [] for c in ['region', 'sport', 'sex', 'year', 'medal', 'count', 'table_count']}),
+            sport_options=list(d.season_sport_options.get(season, no_season_sport_options)[0])
+        )
+    return payload
+
+# Alles, was aus einem Datenstand abgeleitet wird – als ein unveränderliches Objekt. apply_dataset
+# veröffentlicht einen neuen Stand mit einer einzigen Zuweisung an `dataset`; jeder Callback liest
+# `dataset` genau einmal und rechnet mit diesem Stand zu Ende, auch wenn währenddessen ein neuer kommt
+# (sonst könnten z. B. neue Region-Codes auf alte Präfixsummen treffen).
+Dataset = namedtuple('Dataset', [
+    'events', 'meta', 'medal_cubes', 'sport_facts', 'year_prefix_sums', 'heatmap_tensors',
+    'season_codes', 'sport_codes_de', 'region_codes_de', 'sex_codes', 'medal_codes', 'sport_labels_de',
+    'medal_labels', 'time_periods', 'sport_options', 'region_options', 'season_sport_options', 'medal_aggregate',
+])
+
+# Beim Start komplett aus events; nach einer angehängten Austragung (data_loader.append_games) beschreibt
+# delta die eingefügten Zeilen, und Würfel, Tensoren und Fakten von previous werden nur um diese
+# ergänzt. previous selbst bleibt unverändert.
+def build_dataset(events, meta, previous=None, delta=None):
+    shape = [len(events[c].cat.categories) for c in ['region', 'sport', 'sex', 'medal']]
+    totals_shape = [shape[0], shape[2], shape[3]]  # Präfixsummen ohne Sportart-Achse
+    # Code -> Beschriftung, für Achsen und Legenden
+    sport_labels_de = np.array([sport_translation.get(s, s) for s in events['sport'].cat.categories], dtype=object)
+    if delta is None:
+        # Medaillen-Würfel je Zählweise einmalig vorberechnen – die Charts schneiden nur noch darin
+        # (der Medaillenspiegel dedupliziert Team-Medaillen hier, nicht bei jeder Anfrage)
+        medal_cubes = {mode: build_medal_cube(events, medal_table=mode == 'table') for mode in count_modes}
+        # Fakten je (Saison, Sportart) in einem gruppierten Durchlauf – sportart_fakten schlägt nur noch nach
+        sport_facts = build_sport_facts(events)
+        # Kumulierte Zählungen über die Jahre: Summen für beliebige Zeiträume (Jahres-Slider) in O(1)
+        year_prefix_sums = {mode: YearPrefixSums(cube, totals_shape) for mode, cube in medal_cubes.items()}
+        # Heatmap-Tensor (region × Sportart × Jahr je Saison/Geschlecht) mit fertig übersetzter Sportart-Achse
+        heatmap_tensors = {mode: HeatmapTensor(cube, shape[0], sport_labels_de) for mode, cube in medal_cubes.items()}
+    else:
+        new_rows = events.iloc[delta['start']:delta['start'] + delta['rows']]
+        # Angehängt werden nur ganze neue Austragungen – deduplizieren innerhalb der neuen Zeilen genügt
+        delta_cubes = {mode: build_medal_cube(new_rows, medal_table=mode == 'table') for mode in count_modes}
+        medal_cubes = {mode: merge_medal_cubes(previous.medal_cubes[mode], delta_cubes[mode]) for mode in count_modes}
+        year_prefix_sums = {
+            mode: previous.year_prefix_sums[mode].extended(delta_cubes[mode], totals_shape) for mode in count_modes
+        }
+        heatmap_tensors = {
+            mode: previous.heatmap_tensors[mode].extended(delta_cubes[mode], shape[0], sport_labels_de)
+            for mode in count_modes
+        }
+        # Fakten nur für die (Saison, Sportart)-Gruppen der neuen Zeilen neu berechnen
+        lo, hi = meta['partitions'][str(new_rows['season'].iloc[0])]
+        season_rows = events.iloc[lo:hi]
+        affected = np.isin(season_rows['sport'].cat.codes.values, np.unique(new_rows['sport'].cat.codes.values))
+        sport_facts = {**previous.sport_facts, **build_sport_facts(season_rows[affected])}
+
+    d = Dataset(
+        events=events,
+        meta=meta,
+        medal_cubes=medal_cubes,
+        sport_facts=sport_facts,
+        year_prefix_sums=year_prefix_sums,
+        heatmap_tensors=heatmap_tensors,
+        # Dropdown-Werte (Deutsch) direkt auf Integer-Codes abbilden – Filter vergleichen nur noch Codes
+        season_codes=category_codes(events, 'season'),
+        sport_codes_de={sport_translation.get(s, s): code for s, code in category_codes(events, 'sport').items()},
+        region_codes_de={
+            country_translation.get(r, r): code for r, code in category_codes(events, 'region').items()
+        },
+        sex_codes=category_codes(events, 'sex'),
+        medal_codes=category_codes(events, 'medal'),
+        sport_labels_de=sport_labels_de,
+        medal_labels=events['medal'].cat.categories,
+        time_periods=build_time_periods(*meta['options']['years']),
+        # Sportarten und Länder auf Deutsch für Dropdowns
+        sport_options=[{'label': '🏆 Alle Sportarten', 'value': 'Alle'}] + [
+            {'label': sport_translation.get(s, s), 'value': sport_translation.get(s, s)}
+            for s in meta['options']['sports']
+        ],
+        region_options=[
+            {'label': country_translation.get(c, c), 'value': country_translation.get(c, c)}
+            for c in meta['options']['regions']
+        ],
+        season_sport_options={
+            season: build_season_sport_options(sports_en)
+            for season, sports_en in meta['options']['sports_by_season'].items()
+        },
+        medal_aggregate=None,
+    )
+    return d._replace(medal_aggregate=clientside_aggregate(d)) if clientside_charts else d
+
+dataset = None
+
+def apply_dataset(events, meta, delta=None):
+    global dataset
+    dataset = build_dataset(events, meta, dataset if delta is not None else None, delta)
+
+apply_dataset(athlete_events, dataset_meta)
+del athlete_events, dataset_meta
+
+# Neue Store-Version (data_loader.append_games hängt den Link um)? Vor dem nächsten Request übernehmen –
+# ohne Neustart des Workers. Inkrementell nur, wenn die Version direkt auf unserer aufbaut.
+dataset_lock = threading.Lock()
+
+@server.before_request
+def refresh_dataset():
+    version = current_version(STORE_PATH)
+    if version is None or version == dataset.meta.get('version'):
+        return
+    with dataset_lock:
+        if current_version(STORE_PATH) == dataset.meta.get('version'):
+            return
+        events, meta = load_dataset()
+        delta = meta.get('delta')
+        if not delta or delta['base_version'] != dataset.meta.get('version'):
+            delta = None
+        apply_dataset(events, meta, delta)
+        # Erst laufende Berechnungen verwerfen, dann den Namensraum wechseln: ein Ergebnis aus dem alten
+        # Stand landet so nie unter dem neuen (Berechnungen legen unter ihrem Start-Namensraum ab)
+        figure_cache.clear()
+        if shared_cache is not None:
+            shared_cache.namespace = cache_namespace(meta)
+
+# Hintergrund-Modus: Eingaben für den Job und Status einer Ansicht. Der Job ist ein einziger Schritt
+# (Cache-Treffer oder Berechnung) – daher ein unbestimmter Balken ohne Wert statt eines Prozentstands
+def background_components(view):
+    if view not in background_views:
+        return []
+    return [
+        dcc.Store(id=f'{view}-request'),
+        html.Progress(id=f'{view}-progress', style={'display': 'none'}),
+        html.Span(id=f'{view}-status', style={'marginLeft': '10px'}),
+    ]
+
+# Optionen eines Hintergrund-Callbacks; ein neuer Aufruf bricht den laufenden Job ab (oldJob im Renderer).
+# Ein Job startet erst, wenn der vorgeschaltete Callback eine Anfrage abgelegt hat – nicht beim Seitenaufruf
+def background_options(view):
+    return dict(
+        background=True,
+        manager=background_manager,
+        prevent_initial_call=True,
+        running=[
+            (Output(f'{view}-status', 'children'), '⏳ Wird berechnet …', ''),
+            (Output(f'{view}-progress', 'style'), {}, {'display': 'none'}),
+        ],
+    )
+
+# Layout als Funktion: jeder Seitenaufruf bekommt Optionen und Zeiträume des aktuellen Datenstands
+def serve_layout():
+    d = dataset
+    time_periods = d.time_periods
+    default_period = next(iter(time_periods))
+    return html.Div([
+        html.H1("🏅 Olympische Spiele Dashboard", style={'textAlign': 'center'}),
+        html.Div([
+            html.Label("Zeitraum:"),
+            dcc.Dropdown(
+                id='period-dropdown',
+                options=[{'label': k, 'value': k} for k in time_periods],
+                value=default_period
+            ),
+            html.Label("Jahre (frei wählbar):"),
+            dcc.RangeSlider(
+                id='year-slider',
+                min=time_periods[default_period][0],
+                max=time_periods[default_period][1],
+                step=1,
+                value=list(time_periods[default_period]),
+                marks={y: str(y) for y in sorted({y for bounds in time_periods.values() for y in bounds})},
+                tooltip={'placement': 'bottom'}
+            ),
+            html.Label("Saison:"),
+            dcc.Dropdown(
+                id='season-dropdown',
+                options=[{'label': '☀️ Sommer', 'value': 'Summer'}, {'label': '❄️ Winter', 'value': 'Winter'}],
+                value='Summer'
+            ),
+            html.Label("Land (einzeln):"),
+            dcc.Dropdown(id='country-dropdown', options=d.region_options, value='Deutschland'),
+            html.Label("Sportart:"),
+            dcc.Dropdown(id='sport-dropdown', options=d.sport_options, value='Alle'),
+            html.Label("Geschlecht:"),
+            dcc.Dropdown(
+                id='gender-dropdown',
+                options=[{'label': '👥 Alle', 'value': 'Alle'}, {'label': '👨 Männer', 'value': 'M'}, {'label': '👩 Frauen', 'value': 'F'}],
+                value='Alle'
+            ),
+            html.Label("Zählweise:"),
+            dcc.Dropdown(
+                id='count-mode-dropdown',
+                options=[{'label': label, 'value': mode} for mode, label in count_modes.items()],
+                value='athletes',
+                clearable=False
+            ),
+        ], style={'columnCount': 2}),
+
+        # Nur der sichtbare Tab wird berechnet, die anderen beim Wechsel (meist aus dem Cache)
+        dcc.Tabs(id='chart-tabs', value='medals', children=[
+            dcc.Tab(label='🏅 Einzelvergleich', value='medals', children=[
+                dcc.Graph(id='medals-chart'),
+                dcc.Store(id='medals-chart-structure')
+            ]),
+            dcc.Tab(label='🔥 Heatmap', value='heatmap', children=[
+                *background_components('heatmap'),
+                dcc.Graph(id='heatmap-chart'),
+                dcc.Store(id='heatmap-chart-structure')
+            ]),
+            dcc.Tab(label='🌍 Ländervergleich', value='country-comparison', children=[
+                html.Div(id="country-comparison-filters", children=[
+                    html.Label("Länder (mehrfach):"),
+                    dcc.Dropdown(
+                        id='multi-country-dropdown',
+                        options=d.region_options,
+                        value=['Deutschland', 'Vereinigte Staaten'],
+                        multi=True
+                    ),
+                    html.Label("Medaillentyp:"),
+                    dcc.Dropdown(
+                        id='medal-dropdown',
+                        options=[{'label': m, 'value': m} for m in ['Alle', 'Gold', 'Silver', 'Bronze']],
+                        value='Alle'
+                    )
+                ], style={'columnCount': 2, 'marginBottom': '20px'}),
+                dcc.Graph(id='country-comparison-chart'),
+                dcc.Store(id='country-comparison-chart-structure')
+            ]),
+        ]),
+
+        html.H2("Fakten zu den Sportarten", style={'marginTop': '40px'}),
+        html.Label("Wähle eine Sportart:"),
         dcc.Dropdown(
-            id='gender-dropdown',
-            options=[{'label': '👥 Alle', 'value': 'Alle'}, {'label': '👨 Männer', 'value': 'M'}, {'label': '👩 Frauen', 'value': 'F'}],
-            value='Alle'
+            id='sportart-fakten-dropdown',
+            options=d.sport_options,
+            value=d.sport_options[1]['value'],  # erste echte Sportart als Default
+            clearable=False,
+            style={'width': '60%'}
         ),
-    ], style={'columnCount': 2}),
+        *background_components('sportart-fakten'),
+        html.Div(id='sportart-fakten-output', style={'fontSize': '18px', 'marginTop': '20px'}),
+        dcc.Store(id='time-periods', data={name: list(bounds) for name, bounds in time_periods.items()}),
+        *([dcc.Store(id='medal-aggregate', data=d.medal_aggregate)] if clientside_charts else [])
+    ])
 
-    dcc.Tabs([
-        dcc.Tab(label='🏅 Einzelvergleich', children=[
-            dcc.Graph(id='medals-chart')
-        ]),
-        dcc.Tab(label='🔥 Heatmap', children=[
-            dcc.Graph(id='heatmap-chart')
-        ]),
-        dcc.Tab(label='🌍 Ländervergleich', children=[
-            html.Div(id="country-comparison-filters", children=[
-                html.Label("Länder (mehrfach):"),
-                dcc.Dropdown(
-                    id='multi-country-dropdown',
-                    options=region_options,
-                    value=['Deutschland', 'Vereinigte Staaten'],
-                    multi=True
-                ),
-                html.Label("Medaillentyp:"),
-                dcc.Dropdown(
-                    id='medal-dropdown',
-                    options=[{'label': m, 'value': m} for m in ['Alle', 'Gold', 'Silver', 'Bronze']],
-                    value='Alle'
-                )
-            ], style={'columnCount': 2, 'marginBottom': '20px'}),
-            dcc.Graph(id='country-comparison-chart')
-        ]),
-    ]),
-
-    html.H2("Fakten zu den Sportarten", style={'marginTop': '40px'}),
-    html.Label("Wähle eine Sportart:"),
-    dcc.Dropdown(
-        id='sportart-fakten-dropdown',
-        options=sport_options,
-        value=sport_options[1]['value'],  # erste echte Sportart als Default
-        clearable=False,
-        style={'width': '60%'}
-    ),
-    html.Div(id='sportart-fakten-output', style={'fontSize': '18px', 'marginTop': '20px'})
-])
+app.layout = serve_layout
 
-@app.callback(
-    Output('sport-dropdown', 'options'),
-    Output('sport-dropdown', 'value'),
-    Output('sportart-fakten-dropdown', 'options'),
-    Output('sportart-fakten-dropdown', 'value'),
-    Input('season-dropdown', 'value'),
-    prevent_initial_call=False
+# Chart-Callback serverseitig registrieren – oder im clientseitigen Modus die gleichnamige JS-Funktion.
+# Serverseitig hält '<graph>-structure' die Struktur-Signatur der angezeigten Figur: bleibt sie gleich,
+# geht nur ein Patch mit Werten und Titel raus (figure_patch.py)
+def chart_callback(clientside_function, *dependencies):
+    def register(func):
+        if clientside_charts and clientside_function:
+            app.clientside_callback(
+                ClientsideFunction('olympia', clientside_function), *dependencies, State('medal-aggregate', 'data')
+            )
+        else:
+            outputs = [d for d in dependencies if isinstance(d, Output)]
+            inputs = [d for d in dependencies if not isinstance(d, Output)]
+            structure = f"{outputs[0].component_id}-structure"
+            app.callback(
+                *outputs, Output(structure, 'data'), *inputs, State(structure, 'data')
+            )(with_figure_patch(func))
+        return func
+    return register
+
+# Zeitraum-Auswahl setzt nur den Slider – im Browser, ohne Server-Roundtrip
+app.clientside_callback(
+    "function(period, periods) { return periods[period] || window.dash_clientside.no_update; }",
+    Output('year-slider', 'value'),
+    Input('period-dropdown', 'value'),
+    State('time-periods', 'data')
 )
-def update_sport_options(season):
-    sports_en = sorted(athlete_events[athlete_events['season'] == season]['sport'].dropna().unique())
-    sports_de = [sport_translation.get(s, s) for s in sports_en]
-    options = [{'label': '🏆 Alle Sportarten', 'value': 'Alle'}] + [
-        {'label': de, 'value': de} for de in sports_de
-    ]
-    value_dropdown = 'Alle'
-    value_fakten = sports_de[0] if sports_de else 'Alle'
-    return options, value_dropdown, options, value_fakten
 
 # Land Dropdown: Deutsch -> Englisch für Filterung
 def country_de_to_en(de):
@@ -329,173 +612,268 @@ def country_de_to_en(de):
 def sport_de_to_en(de):
     return sport_translation_de_to_en.get(de, de)
 
-@app.callback(
+# Die Sportarten-Auswahl ist Ein- und Ausgabe desselben Callbacks: ein Saisonwechsel setzt
+# Optionen und Auswahl im selben Durchlauf, statt über einen eigenen Callback die Figur
+# ein zweites Mal auszulösen
+@chart_callback(
+    'medals_chart',
     Output('medals-chart', 'figure'),
-    Input('period-dropdown', 'value'),
+    Output('sport-dropdown', 'options'),
+    Output('sport-dropdown', 'value'),
+    Input('chart-tabs', 'value'),
+    Input('year-slider', 'value'),
     Input('season-dropdown', 'value'),
     Input('country-dropdown', 'value'),
     Input('sport-dropdown', 'value'),
-    Input('gender-dropdown', 'value')
+    Input('gender-dropdown', 'value'),
+    Input('count-mode-dropdown', 'value')
 )
-def update_medals_chart(period, season, country_de, sport_de, gender):
-    start, end = time_periods[period]
-    country_en = country_de_to_en(country_de)
-    df = athlete_events[
-        (athlete_events['year'].between(start, end)) &
-        (athlete_events['season'] == season) &
-        (athlete_events['region'] == country_en) &
-        (athlete_events['medal'].notna())
-    ]
-    if sport_de != 'Alle':
-        sport_en = sport_de_to_en(sport_de)
-        df = df[df['sport'] == sport_en]
-    if gender != 'Alle':
-        df = df[df['sex'] == gender]
+def render_medals_tab(tab, years, season, country_de, sport_de, gender, mode):
+    options = sport_value = dash.no_update
+    if dash.ctx.triggered_id in (None, 'season-dropdown'):
+        options, _ = dataset.season_sport_options.get(season, no_season_sport_options)
+        sport_de = sport_value = 'Alle'
+    # Verdeckter Tab: nichts rechnen, die Figur wird beim Wechsel auf den Tab nachgeholt
+    if tab != 'medals':
+        return dash.no_update, options, sport_value
+    return update_medals_chart(years, season, country_de, sport_de, gender, mode), options, sport_value
+
+# Zählweise mit Default: Aufrufe ohne sie (z. B. aus älteren Request-Logs) treffen denselben Cache-Eintrag
+@figure_cache.memoize(
+    'medals',
+    key=lambda years, season, country_de, sport_de, gender, mode='athletes': (
+        normalize_years(years), season, country_de, sport_de, gender, count_mode(mode)
+    )
+)
+def update_medals_chart(years, season, country_de, sport_de, gender, mode='athletes'):
+    d = dataset
+    start, end = normalize_years(years)
+    df = slice_medal_cube(
+        d.medal_cubes[count_mode(mode)], d.season_codes.get(season), [d.region_codes_de.get(country_de)], start, end,
+        sport=d.sport_codes_de.get(sport_de, -2) if sport_de != 'Alle' else None,
+        gender=d.sex_codes.get(gender, -2) if gender != 'Alle' else None
+    )
+    if metrics:
+        metrics.count_rows(len(df))
     if df.empty:
         return go.Figure().add_annotation(text="⚠️ Keine Daten verfügbar", x=0.5, y=0.5, showarrow=False)
-    count = df.groupby(['year', 'medal']).size().unstack(fill_value=0)
+    count = df.groupby(['year', 'medal'])['count'].sum().unstack(fill_value=0)
+    count.columns = d.medal_labels[count.columns]
     fig = go.Figure()
     for m in ['Bronze', 'Silver', 'Gold']:
         if m in count:
             fig.add_trace(go.Bar(x=count.index, y=count[m], name=m, marker_color=medal_colors[m]))
     fig.update_layout(
         barmode='stack',
-        title=f"{country_de} – {sport_de if sport_de != 'Alle' else 'alle Sportarten'} ({season}, {period})",
+        title=f"{country_de} – {sport_de if sport_de != 'Alle' else 'alle Sportarten'} ({season}, {period_label(d.time_periods, start, end)})"
+              f"{count_mode_suffix(mode)}",
         xaxis_title='Jahr',
         yaxis_title='Medaillen',
         yaxis=dict(tickformat=".0f")
     )
     return fig
 
-@app.callback(
-    Output('heatmap-chart', 'figure'),
-    Input('period-dropdown', 'value'),
+heatmap_inputs = [
+    Input('chart-tabs', 'value'),
+    Input('year-slider', 'value'),
     Input('season-dropdown', 'value'),
     Input('country-dropdown', 'value'),
-    Input('gender-dropdown', 'value')
+    Input('gender-dropdown', 'value'),
+    Input('count-mode-dropdown', 'value')
+]
+
+if 'heatmap' in background_views:
+    # Nur der sichtbare Tab startet einen Job: ein schneller Callback reicht die Eingaben weiter
+    @app.callback(Output('heatmap-request', 'data'), *heatmap_inputs)
+    def request_heatmap(tab, *args):
+        if tab != 'heatmap':
+            return dash.no_update
+        return list(args)
+
+    @app.callback(
+        Output('heatmap-chart', 'figure'),
+        Output('heatmap-chart-structure', 'data'),
+        Input('heatmap-request', 'data'),
+        State('heatmap-chart-structure', 'data'),
+        **background_options('heatmap')
+    )
+    def render_heatmap_job(request, signature):
+        return patch_figure(update_heatmap(*request), signature)
+else:
+    @chart_callback(None, Output('heatmap-chart', 'figure'), *heatmap_inputs)
+    def render_heatmap_tab(tab, *args):
+        if tab != 'heatmap':
+            return dash.no_update
+        return update_heatmap(*args)
+
+@figure_cache.memoize(
+    'heatmap',
+    key=lambda years, season, country_de, gender, mode='athletes': (
+        normalize_years(years), season, country_de, gender, count_mode(mode)
+    )
 )
-def update_heatmap(period, season, country_de, gender):
-    start, end = time_periods[period]
-    country_en = country_de_to_en(country_de)
-    df = athlete_events[
-        (athlete_events['year'].between(start, end)) &
-        (athlete_events['season'] == season) &
-        (athlete_events['region'] == country_en) &
-        (athlete_events['medal'].notna())
-    ]
-    if gender != 'Alle':
-        df = df[df['sex'] == gender]
-    if df.empty:
+def update_heatmap(years, season, country_de, gender, mode='athletes'):
+    d = dataset
+    start, end = normalize_years(years)
+    z, sports_de, heat_years = d.heatmap_tensors[count_mode(mode)].matrix(
+        d.season_codes.get(season), d.region_codes_de.get(country_de), start, end,
+        sex=d.sex_codes.get(gender, -2) if gender != 'Alle' else None
+    )
+    if metrics:
+        metrics.count_rows(z.size)
+    if z.size == 0:
         return go.Figure().add_annotation(text="⚠️ Keine Daten verfügbar", x=0.5, y=0.5, showarrow=False)
-    matrix = df.copy()
-    matrix['sport_de'] = matrix['sport'].map(lambda x: sport_translation.get(x, x))
-    mat = matrix.groupby(['sport_de', 'year']).size().unstack(fill_value=0)
     fig = go.Figure(data=go.Heatmap(
-        z=mat.values, x=mat.columns, y=mat.index,
+        z=z, x=heat_years, y=sports_de,
         colorscale='YlOrBr',
         colorbar=dict(title='Medaillen'),
         hovertemplate='Disziplin: %{y}<br>Jahr: %{x}<br>Anzahl: %{z}<extra></extra>'
     ))
     fig.update_layout(
-        title=f"Heatmap – {country_de} ({season}, {period})",
+        title=f"Heatmap – {country_de} ({season}, {period_label(d.time_periods, start, end)}){count_mode_suffix(mode)}",
         xaxis_title='Jahr',
         yaxis_title='Sportart'
     )
     return fig
 
-@app.callback(
+@chart_callback(
+    'country_comparison_chart',
     Output('country-comparison-chart', 'figure'),
-    Input('period-dropdown', 'value'),
+    Input('chart-tabs', 'value'),
+    Input('year-slider', 'value'),
     Input('season-dropdown', 'value'),
     Input('multi-country-dropdown', 'value'),
     Input('medal-dropdown', 'value'),
-    Input('gender-dropdown', 'value')
+    Input('gender-dropdown', 'value'),
+    Input('count-mode-dropdown', 'value')
 )
-def update_country_comparison(period, season, countries_de, medal_type, gender):
-    start, end = time_periods[period]
-    countries_en = [country_de_to_en(c) for c in countries_de]
-    df = athlete_events[
-        (athlete_events['year'].between(start, end)) &
-        (athlete_events['season'] == season) &
-        (athlete_events['region'].isin(countries_en)) &
-        (athlete_events['medal'].notna())
-    ]
+def render_country_comparison_tab(tab, years, season, countries_de, *rest):
+    if tab != 'country-comparison':
+        return dash.no_update
+    return in_selection_order(update_country_comparison(years, season, countries_de, *rest), countries_de)
+
+# Gecacht sind die Balken in sortierter Länderreihenfolge; angezeigt werden sie in der Reihenfolge der Auswahl
+def in_selection_order(fig, countries_de):
+    if not fig.get('data') or not countries_de:
+        return fig
+    bars = fig['data'][0]
+    position = {country: i for i, country in enumerate(bars['x'])}
+    order = [position[c] for c in countries_de]
+    for key in ['x', 'y', 'text']:
+        bars[key] = [bars[key][i] for i in order]
+    return fig
+
+# Schlüssel ist die sortierte Länderauswahl – die Reihenfolge im Dropdown spielt keine Rolle
+@figure_cache.memoize(
+    'country-comparison',
+    key=lambda years, season, countries_de, medal_type, gender, mode='athletes': (
+        normalize_years(years), season, tuple(sorted(countries_de or [])), medal_type, gender, count_mode(mode)
+    )
+)
+def update_country_comparison(years, season, countries_de, medal_type, gender, mode='athletes'):
+    d = dataset
+    start, end = normalize_years(years)
+    countries_de = sorted(countries_de or [])
+    known = [c for c in countries_de if c in d.region_codes_de]
+    # Summe im Zeitraum = Differenz zweier Präfixwerte, danach nur noch Achsen auswählen/summieren
+    totals = d.year_prefix_sums[count_mode(mode)].totals(
+        d.season_codes.get(season), start, end, [d.region_codes_de[c] for c in known]
+    )
+    if metrics and totals is not None:
+        metrics.count_rows(totals.size)
+    if totals is None or not known:
+        return go.Figure().add_annotation(text="⚠️ Keine Medaillendaten für diese Auswahl", x=0.5, y=0.5, showarrow=False)
     if gender != 'Alle':
-        df = df[df['sex'] == gender]
+        totals = totals[:, [d.sex_codes[gender]] if gender in d.sex_codes else []]
     if medal_type != 'Alle':
-        df = df[df['medal'] == medal_type]
-    if df.empty:
+        totals = totals[:, :, [d.medal_codes[medal_type]] if medal_type in d.medal_codes else []]
+    per_region = dict(zip(known, totals.sum(axis=(1, 2))))
+    if not any(per_region.values()):
         return go.Figure().add_annotation(text="⚠️ Keine Medaillendaten für diese Auswahl", x=0.5, y=0.5, showarrow=False)
-    counts = df.groupby('region').size().reindex(countries_en, fill_value=0)
-    # Achsen wieder auf Deutsch
-    countries_de_axis = [country_translation.get(c, c) for c in counts.index]
+    counts = np.array([per_region.get(c, 0) for c in countries_de])
     fig = go.Figure(data=[go.Bar(
-        x=countries_de_axis,
-        y=counts.values,
+        x=countries_de,
+        y=counts,
         marker_color=medal_colors[medal_type],
-        text=counts.values,
+        text=counts,
         textposition='auto'
     )])
     fig.update_layout(
-        title=f"Medaillenvergleich ({medal_type}) – {season} {period}" + (f", Geschlecht: {gender}" if gender != 'Alle' else ""),
+        title=f"Medaillenvergleich ({medal_type}) – {season} {period_label(d.time_periods, start, end)}" + (f", Geschlecht: {gender}" if gender != 'Alle' else "")
+              + count_mode_suffix(mode),
         xaxis_title="Land",
         yaxis_title="Anzahl Medaillen",
         yaxis=dict(tickformat=".0f")
     )
     return fig
 
-@app.callback(
-    Output('sportart-fakten-output', 'children'),
-    Input('sportart-fakten-dropdown', 'value'),
-    Input('season-dropdown', 'value')
-)
+# Wie beim Einzelvergleich: Saisonwechsel setzt die Fakten-Auswahl im selben Callback zurück
+def fakten_selection(sportart_de, season):
+    options = value = dash.no_update
+    if dash.ctx.triggered_id in (None, 'season-dropdown'):
+        options, sportart_de = dataset.season_sport_options.get(season, no_season_sport_options)
+        value = sportart_de
+    return sportart_de, options, value
+
+if 'sportart-fakten' in background_views:
+    @app.callback(
+        Output('sportart-fakten-request', 'data'),
+        Output('sportart-fakten-dropdown', 'options'),
+        Output('sportart-fakten-dropdown', 'value'),
+        Input('sportart-fakten-dropdown', 'value'),
+        Input('season-dropdown', 'value')
+    )
+    def request_sportart_fakten(sportart_de, season):
+        sportart_de, options, value = fakten_selection(sportart_de, season)
+        return [sportart_de, season], options, value
+
+    @app.callback(
+        Output('sportart-fakten-output', 'children'),
+        Input('sportart-fakten-request', 'data'),
+        **background_options('sportart-fakten')
+    )
+    def render_sportart_fakten_job(request):
+        return sportart_fakten(*request)
+else:
+    @app.callback(
+        Output('sportart-fakten-output', 'children'),
+        Output('sportart-fakten-dropdown', 'options'),
+        Output('sportart-fakten-dropdown', 'value'),
+        Input('sportart-fakten-dropdown', 'value'),
+        Input('season-dropdown', 'value')
+    )
+    def render_sportart_fakten(sportart_de, season):
+        sportart_de, options, value = fakten_selection(sportart_de, season)
+        return sportart_fakten(sportart_de, season), options, value
+
+@figure_cache.memoize('sportart-fakten')
 def sportart_fakten(sportart_de, season):
     if sportart_de == 'Alle':
         return html.Div("Bitte eine konkrete Sportart auswählen.")
 
-    sport_en = sport_de_to_en(sportart_de)
-    df = athlete_events[(athlete_events['sport'] == sport_en) & (athlete_events['season'] == season)]
+    d = dataset
+    facts = d.sport_facts.get((d.season_codes.get(season), d.sport_codes_de.get(sportart_de)))
+    if metrics:
+        metrics.count_rows(facts is not None)
 
-    if df.empty:
+    if facts is None:
         return html.Div("Keine Daten für diese Kombination.")
 
-    austragungen = df['year'].nunique()
-    first_year = df['year'].min()
-    last_year = df['year'].max()
-    unique_athletes = df['name'].nunique()
-    unique_countries = df['region'].nunique()
-
-    # Teilnahmen
-    teilnahmen_athlet = df.groupby('name').size()
-    top_athlet = teilnahmen_athlet.idxmax() if not teilnahmen_athlet.empty else "Keine Daten"
-    top_athlet_count = teilnahmen_athlet.max() if not teilnahmen_athlet.empty else 0
-
-    teilnahmen_land = df.groupby('region').size()
-    top_land_en = teilnahmen_land.idxmax() if not teilnahmen_land.empty else "Keine Daten"
-    top_land = country_translation.get(top_land_en, top_land_en)
-    top_land_count = teilnahmen_land.max() if not teilnahmen_land.empty else 0
-
-    # Erfolgreichster Sportler und Land basierend auf Goldmedaillen
-    gold_df = df[df['medal'] == 'Gold']
-    if not gold_df.empty:
-        top_gold_athlete = gold_df['name'].value_counts().idxmax()
-        top_gold_athlete_count = gold_df['name'].value_counts().max()
-        top_gold_country_en = gold_df['region'].value_counts().idxmax()
-        top_gold_country = country_translation.get(top_gold_country_en, top_gold_country_en)
-        top_gold_country_count = gold_df['region'].value_counts().max()
-    else:
-        top_gold_athlete = "Keine Daten"
-        top_gold_athlete_count = 0
-        top_gold_country = "Keine Daten"
-        top_gold_country_count = 0
-
-    # Häufigste Disziplin
-    if 'event' in df.columns:
-        top_event = df['event'].value_counts().idxmax()
-        top_event_count = df['event'].value_counts().max()
-    else:
-        top_event = "Keine Daten"
-        top_event_count = 0
+    # (Wert, Anzahl) oder None, falls es keine Daten gibt (z. B. keine Goldmedaillen)
+    def top(name, translation=None):
+        if facts[name] is None:
+            return "Keine Daten", 0
+        value, count = facts[name]
+        return (translation.get(value, value) if translation else value), count
+
+    austragungen, first_year, last_year = facts['editions'], facts['first_year'], facts['last_year']
+    unique_athletes = facts['athletes']
+    unique_countries = facts['countries']
+    top_athlet, top_athlet_count = top('top_athlete')
+    top_land, top_land_count = top('top_country', country_translation)
+    top_gold_athlete, top_gold_athlete_count = top('top_gold_athlete')
+    top_gold_country, top_gold_country_count = top('top_gold_country', country_translation)
+    top_event, top_event_count = top('top_event')
 
     return html.Div([
         html.H4(f"Fakten zur Sportart: {sportart_de} ({season})"),
@@ -511,5 +889,59 @@ def sportart_fakten(sportart_de, season):
         ])
     ])
 
+# Nach allen Callbacks: Messung an den Server hängen und /metrics bereitstellen
+if metrics:
+    metrics.instrument(app)
+
+# Profiling auf Abruf (PROFILE_CALLBACKS / PROFILE_TOKEN, siehe profiling.py)
+callback_profiler = CallbackProfiler.from_environ()
+if callback_profiler:
+    callback_profiler.instrument(app)
+
+# Trefferquote des Figuren-Caches
+@server.route('/cache-stats')
+def cache_stats():
+    return figure_cache.stats()
+
+# Default-Ansichten des Layouts (alle Zeiträume und Saisons) für das Vorwärmen
+def default_views():
+    d = dataset
+    views = []
+    for years in d.time_periods.values():
+        for season in ['Summer', 'Winter']:
+            views += [
+                ('medals', (years, season, 'Deutschland', 'Alle', 'Alle')),
+                ('heatmap', (years, season, 'Deutschland', 'Alle')),
+                ('country-comparison', (years, season, ('Deutschland', 'Vereinigte Staaten'), 'Alle', 'Alle')),
+            ]
+    # Fakten-Default je Saison wie nach Seitenaufruf bzw. Saisonwechsel (fakten_selection)
+    views += [
+        ('sportart-fakten', (d.season_sport_options.get(season, no_season_sport_options)[1], season))
+        for season in ['Summer', 'Winter']
+    ]
+    return views
+
+# Cache vorwärmen: Defaults plus die top_n häufigsten Anfragen aus dem Request-Log
+def warm_cache(request_log=None, top_n=50):
+    views = default_views()
+    if request_log:
+        views += top_requests(request_log, top_n)
+    return warm_up(figure_cache, views)
+
+if os.environ.get('WARMUP_ON_BOOT'):
+    warm_cache(os.environ.get('REQUEST_LOG_PATH'), int(os.environ.get('WARMUP_TOP_N', '50')))
+
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port=8050)
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--warmup', action='store_true', help='nur den (geteilten) Cache vorwärmen, keinen Server starten')
+    parser.add_argument('--request-log', default=os.environ.get('REQUEST_LOG_PATH'))
+    parser.add_argument('--top', type=int, default=50)
+    args = parser.parse_args()
+    if args.warmup:
+        if shared_cache is None:
+            print("Hinweis: ohne SHARED_CACHE_PATH bleibt der vorgewärmte Cache in diesem Prozess.")
+        done, seconds = warm_cache(args.request_log, args.top)
+        print(f"{done} Ansichten in {seconds:.1f}s vorgewärmt.")
+    else:
+        app.run_server(debug=True, host='0.0.0.0', port=8050)
@@ -0,0 +1,157 @@
+"""Profiling einzelner Dash-Callback-Aufrufe auf Abruf, auch im Produktivbetrieb.
+
+Aktiv ist es nur, wenn PROFILE_CALLBACKS (kommagetrennte Funktionsnamen oder
+'*') oder PROFILE_TOKEN gesetzt ist; sonst wird kein Callback umhüllt.
+
+* PROFILE_CALLBACKS: diese Callbacks werden laufend profiliert,
+* PROFILE_TOKEN: eine Anfrage mit Header 'X-Profile-Callback: <Token>'
+  wird profiliert (jeder Callback, z. B. um eine langsame Kombination aus
+  dem Browser heraus gezielt aufzuzeichnen).
+
+Beides ist durch PROFILE_MIN_INTERVAL (Sekunden, Standard 60) je Prozess
+begrenzt. Je Aufruf landen in PROFILE_DIR ein Profil und eine JSON-Datei
+mit Eingaben und Laufzeit. Format per PROFILE_FORMAT:
+
+* pstats (Standard): deterministisch mit cProfile, auswertbar mit
+  `python -m pstats` oder snakeviz,
+* collapsed: Stichproben des Stacks alle PROFILE_SAMPLE_MS Millisekunden,
+  eine Zeile je Stack ("a;b;c Anzahl") – direkt für flamegraph.pl/speedscope.
+"""
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import flask
+
+PROFILE_HEADER = 'X-Profile-Callback'
+
+
+class StackSampler:
+    """Sammelt in einem Hintergrund-Thread die Stacks eines Threads (collapsed-Format)."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CallbackProfiler:
+    def __init__(self, directory='profiles', callbacks=(), token=None, min_interval=60.0,
+                 output_format='pstats', sample_interval=0.001):
+        self.directory = directory
+        self.callbacks = set(callbacks)
+        self.token = token
+        self.min_interval = min_interval
+        self.output_format = output_format
+        self.sample_interval = sample_interval
+        self._last = float('-inf')
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environ(cls, environ=os.environ):
+        """Profiler laut Umgebungsvariablen oder None, wenn Profiling aus ist."""
+        callbacks = [c.strip() for c in environ.get('PROFILE_CALLBACKS', '').split(',') if c.strip()]
+        token = environ.get('PROFILE_TOKEN') or None
+        if not callbacks and not token:
+            return None
+        return cls(
+            directory=environ.get('PROFILE_DIR', 'profiles'),
+            callbacks=callbacks,
+            token=token,
+            min_interval=float(environ.get('PROFILE_MIN_INTERVAL', '60')),
+            output_format=environ.get('PROFILE_FORMAT', 'pstats'),
+            sample_interval=float(environ.get('PROFILE_SAMPLE_MS', '1')) / 1000,
+        )
+
+    def instrument(self, app):
+        """Umhüllt die registrierten Server-Callbacks (nach allen app.callback-Aufrufen aufrufen)."""
+        os.makedirs(self.directory, exist_ok=True)
+        for callback in app.callback_map.values():
+            if 'callback' not in callback:
+                continue
+            name = callback['callback'].__name__
+            # Ohne Token kommen nur die laufend profilierten Callbacks in Frage
+            if self.token or '*' in self.callbacks or name in self.callbacks:
+                callback['callback'] = self.wrap(callback['callback'], name)
+
+    def _wanted(self, name):
+        requested = self.token is not None and flask.request.headers.get(PROFILE_HEADER) == self.token
+        if not (requested or '*' in self.callbacks or name in self.callbacks):
+            return False
+        # Höchstens ein Profil je min_interval – kann daher dauerhaft eingeschaltet bleiben
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last < self.min_interval:
+                return False
+            self._last = now
+            return True
+
+    def wrap(self, func, name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self._wanted(name):
+                return func(*args, **kwargs)
+            return self.profile(func, name, args, kwargs)
+        return wrapper
+
+    def profile(self, func, name, args, kwargs):
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+        base = os.path.join(self.directory, f"{stamp}-{os.getpid()}-{name}")
+        start = time.perf_counter()
+        sampler = profiler = None
+        try:
+            if self.output_format == 'collapsed':
+                with StackSampler(threading.get_ident(), self.sample_interval) as sampler:
+                    return func(*args, **kwargs)
+            profiler = cProfile.Profile()
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            # Auch bei Ausnahmen (z. B. PreventUpdate) das Profil schreiben
+            seconds = time.perf_counter() - start
+            if sampler is not None:
+                sampler.write(f"{base}.collapsed")
+            else:
+                profiler.dump_stats(f"{base}.prof")
+            body = flask.request.get_json(silent=True) or {}
+            with open(f"{base}.json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'callback': name,
+                    'output': body.get('output'),
+                    'inputs': body.get('inputs'),
+                    'state': body.get('state'),
+                    'changed': body.get('changedPropIds'),
+                    'seconds': seconds,
+                    'format': self.output_format,
+                }, f, ensure_ascii=False, indent=1, default=str)
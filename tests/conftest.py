@@ -0,0 +1,72 @@
+"""Gemeinsame Fixtures: kleiner Datensatz in tmp_path und die darauf geladene App."""
+import gzip
+import importlib.util
+import pickle
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+APP_FILE = REPO / 'olympische_Spiele_Deployment-Datei.py'
+
+
+def small_athlete_events():
+    rows = []
+    for season, sports, years in [
+        ('Summer', ['Athletics', 'Swimming'], [2000, 2004]),
+        ('Winter', ['Alpine Skiing', 'Biathlon'], [2002, 2006]),
+    ]:
+        for year in years:
+            for sport in sports:
+                for i, (region, sex, medal) in enumerate([
+                    ('Germany', 'M', 'Gold'), ('Germany', 'F', 'Silver'), ('USA', 'M', 'Bronze'), ('USA', 'F', None),
+                ]):
+                    rows.append({
+                        'id': len(rows) + 1, 'name': f'{region} {sport} {i}', 'sex': sex, 'age': 25.0,
+                        'height': None, 'weight': None, 'team': region, 'noc': region[:3].upper(),
+                        'games': f'{year} {season}', 'year': year, 'season': season, 'city': 'City',
+                        'sport': sport, 'event': f'{sport} Event', 'medal': medal, 'region': region, 'notes': None,
+                    })
+    # Mannschaft: drei Athleten, eine Goldmedaille im Medaillenspiegel
+    for i in range(3):
+        rows.append({
+            'id': len(rows) + 1, 'name': f'Germany Handball {i}', 'sex': 'M', 'age': 25.0,
+            'height': None, 'weight': None, 'team': 'Germany', 'noc': 'GER', 'games': '2004 Summer',
+            'year': 2004, 'season': 'Summer', 'city': 'City', 'sport': 'Handball',
+            'event': "Handball Men's Handball", 'medal': 'Gold', 'region': 'Germany', 'notes': None,
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def athlete_events_source(tmp_path, monkeypatch):
+    """Pickle des kleinen Datensatzes; Quelle und Store zeigen per Umgebung auf tmp_path."""
+    source = tmp_path / 'athlete_events.pkl.gz'
+    with gzip.open(source, 'wb') as f:
+        pickle.dump(small_athlete_events(), f)
+    monkeypatch.setenv('ATHLETE_EVENTS_PATH', str(source))
+    monkeypatch.setenv('ATHLETE_EVENTS_STORE', str(tmp_path / 'athlete_events.store'))
+    for name in ['SHARED_CACHE_PATH', 'REQUEST_LOG_PATH', 'WARMUP_ON_BOOT']:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.syspath_prepend(str(REPO))
+    return source
+
+
+@pytest.fixture
+def load_dashboard(athlete_events_source, monkeypatch):
+    """Lädt die App bei jedem Aufruf neu – wie ein frisch gestarteter Worker."""
+    def load():
+        # data_loader liest die Pfade beim Import – frisch importieren
+        monkeypatch.delitem(sys.modules, 'data_loader', raising=False)
+        spec = importlib.util.spec_from_file_location('dashboard_under_test', APP_FILE)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
+
+
+@pytest.fixture
+def dashboard(load_dashboard):
+    return load_dashboard()
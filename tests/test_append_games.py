@@ -0,0 +1,67 @@
+"""Eine angehängte Austragung ergibt dieselben Charts wie ein frisch gestarteter Worker.
+
+refresh_dataset übernimmt den neuen Datenstand inkrementell (meta['delta']);
+der Vergleich mit einem neu geladenen Modul deckt Versatzfehler in Würfeln,
+Indizes und Optionen auf.
+"""
+import sys
+
+import pandas as pd
+
+
+def games_csv(path):
+    rows = []
+    for sport, event, entries in [
+        ('Athletics', 'Athletics Event', [('Germany', 'GER', 'F', 'Gold'), ('France', 'FRA', 'M', 'Silver'),
+                                          ('USA', 'USA', 'M', None)]),
+        # Mannschaft: drei Goldmedaillen der Athleten, eine im Medaillenspiegel
+        ('Handball', 'Handball Event', [('France', 'FRA', 'M', 'Gold')] * 3 + [('Germany', 'GER', 'M', 'Silver')]),
+    ]:
+        for i, (region, noc, sex, medal) in enumerate(entries):
+            rows.append({
+                'ID': 1000 + len(rows), 'Name': f'{region} {sport} {i}', 'Sex': sex, 'Age': 27.0,
+                'Height': None, 'Weight': None, 'Team': region, 'NOC': noc, 'Games': '2020 Summer',
+                'Year': 2020, 'Season': 'Summer', 'City': 'Tokyo', 'Sport': sport, 'Event': event,
+                'Medal': medal, 'region': region, 'notes': None,
+            })
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def chart_outputs(module):
+    d = module.dataset
+    countries = [o['value'] for o in d.region_options]
+    outputs = {}
+    for mode in module.count_modes:
+        for period, years in d.time_periods.items():
+            for season in ['Summer', 'Winter']:
+                for gender in ['Alle', 'M', 'F']:
+                    for country in countries:
+                        for sport in [o['value'] for o in d.season_sport_options[season][0]]:
+                            outputs['medals', mode, period, season, gender, country, sport] = \
+                                module.update_medals_chart(list(years), season, country, sport, gender, mode)
+                        outputs['heatmap', mode, period, season, gender, country] = \
+                            module.update_heatmap(list(years), season, country, gender, mode)
+                    for medal in ['Alle', 'Gold', 'Silver', 'Bronze']:
+                        outputs['country-comparison', mode, period, season, gender, medal] = \
+                            module.update_country_comparison(list(years), season, countries, medal, gender, mode)
+    for season in ['Summer', 'Winter']:
+        for sport in [o['value'] for o in d.season_sport_options[season][0]]:
+            outputs['sportart-fakten', season, sport] = module.sportart_fakten(sport, season)
+    return outputs
+
+
+def test_appended_games_match_a_fresh_worker(load_dashboard, tmp_path):
+    dashboard = load_dashboard()
+    version = dashboard.dataset.meta['version']
+
+    sys.modules['data_loader'].append_games(str(games_csv(tmp_path / 'games_2020.csv')))
+    dashboard.refresh_dataset()
+    assert dashboard.dataset.meta['delta']['base_version'] == version
+    assert 'Frankreich' in dashboard.dataset.region_codes_de
+
+    fresh = load_dashboard()
+    assert fresh.dataset.meta['version'] == dashboard.dataset.meta['version']
+    for field in ['time_periods', 'sport_options', 'region_options', 'season_sport_options']:
+        assert getattr(dashboard.dataset, field) == getattr(fresh.dataset, field), field
+    assert chart_outputs(dashboard) == chart_outputs(fresh)
@@ -0,0 +1,75 @@
+"""Zählt Callback-Aufrufe je Nutzeraktion: jede Aktion soll jede Ausgabe genau einmal berechnen.
+
+Die App wird mit einem kleinen Datensatz in tmp_path geladen; der DashClient
+aus benchmarks/ schickt die Callbacks wie der Dash-Renderer über
+/_dash-update-component und löst mit jeder geänderten Eigenschaft die davon
+abhängigen Callbacks aus.
+"""
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'benchmarks'))
+
+from dash_client import DashClient  # noqa: E402
+
+
+def run(client, values=None):
+    """Aktion über den DashClient; liefert die Anzahl der Aufrufe je Callback."""
+    calls = client.action(values)
+    assert all(status in (200, 204) for _, status, _ in calls)
+    return Counter(spec for spec, _, _ in calls)
+
+
+def test_initial_load_calls_every_callback_once(dashboard):
+    client = DashClient(dashboard.server)
+    calls = run(client)
+    assert set(calls.values()) == {1}
+    assert len(calls) == len(client.callbacks)
+
+
+def test_season_change_computes_each_output_once(dashboard):
+    client = DashClient(dashboard.server)
+    run(client)
+    run(client, {'sport-dropdown.value': client.props['sport-dropdown.options'][1]['value']})
+    misses = dashboard.figure_cache.misses
+
+    calls = run(client, {'season-dropdown.value': 'Winter'})
+
+    assert set(calls.values()) == {1}
+    # Sichtbar sind Einzelvergleich und Fakten: genau zwei Berechnungen
+    assert dashboard.figure_cache.misses - misses == 2
+    assert client.props['sport-dropdown.value'] == 'Alle'
+    assert client.props['sportart-fakten-dropdown.value'] == dashboard.sport_translation['Alpine Skiing']
+    assert 'Winter' in client.props['medals-chart.figure']['layout']['title']['text']
+
+
+def test_hidden_tabs_are_computed_on_switch(dashboard):
+    client = DashClient(dashboard.server)
+    run(client)
+    assert client.props.get('heatmap-chart.figure') is None
+
+    misses = dashboard.figure_cache.misses
+    calls = run(client, {'gender-dropdown.value': 'F'})
+    assert set(calls.values()) == {1}
+    assert dashboard.figure_cache.misses - misses == 1
+
+    calls = run(client, {'chart-tabs.value': 'heatmap'})
+    assert set(calls.values()) == {1}
+    assert client.props['heatmap-chart.figure'] is not None
+    assert dashboard.figure_cache.misses - misses == 2
+
+
+def test_count_mode_switch_recomputes_only_the_visible_chart(dashboard):
+    client = DashClient(dashboard.server)
+    run(client)
+
+    misses = dashboard.figure_cache.misses
+    calls = run(client, {'count-mode-dropdown.value': 'table'})
+    assert set(calls.values()) == {1}
+    assert dashboard.figure_cache.misses - misses == 1
+    assert client.props['medals-chart.figure']['layout']['title']['text'].endswith('Medaillenspiegel')
+
+    calls = run(client, {'count-mode-dropdown.value': 'athletes'})
+    assert dashboard.figure_cache.misses - misses == 1
+    assert not client.props['medals-chart.figure']['layout']['title']['text'].endswith('Medaillenspiegel')
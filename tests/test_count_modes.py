@@ -0,0 +1,19 @@
+"""Zählweisen: Athleten-Medaillen gegenüber Medaillenspiegel (Team-Medaille zählt einmal)."""
+
+
+def bar_values(figure, name):
+    return [y for trace in figure['data'] if trace.get('name') == name for y in trace['y']]
+
+
+def test_team_gold_counts_once_in_the_medal_table(dashboard):
+    years = [2004, 2004]
+    athletes = dashboard.update_medals_chart(years, 'Summer', 'Deutschland', 'Handball', 'Alle', 'athletes')
+    table = dashboard.update_medals_chart(years, 'Summer', 'Deutschland', 'Handball', 'Alle', 'table')
+    assert bar_values(athletes, 'Gold') == [3]
+    assert bar_values(table, 'Gold') == [1]
+
+    # Ländervergleich: je eine Einzel-Goldmedaille in Leichtathletik und Schwimmen plus das Team
+    athletes = dashboard.update_country_comparison(years, 'Summer', ['Deutschland'], 'Gold', 'Alle', 'athletes')
+    table = dashboard.update_country_comparison(years, 'Summer', ['Deutschland'], 'Gold', 'Alle', 'table')
+    assert athletes['data'][0]['y'] == [5]
+    assert table['data'][0]['y'] == [3]
@@ -0,0 +1,26 @@
+"""Geteilter Cache: ein Ergebnis landet unter dem Datenstand, aus dem es berechnet wurde."""
+import sys
+from pathlib import Path
+
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from figure_cache import FigureCache, SharedResultStore  # noqa: E402
+
+
+def test_result_is_stored_under_the_namespace_it_started_with(tmp_path):
+    shared = SharedResultStore(str(tmp_path / 'shared.sqlite'), namespace='v1')
+    cache = FigureCache(shared=shared)
+
+    @cache.memoize('chart')
+    def chart(value):
+        # Neuer Datenstand, während die Berechnung noch läuft
+        shared.namespace = 'v2'
+        return go.Figure(go.Bar(y=[value]))
+
+    chart(1)
+
+    assert shared.get(('chart', 1)) is None
+    shared.namespace = 'v1'
+    assert shared.get(('chart', 1)) is not None
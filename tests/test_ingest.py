@@ -0,0 +1,61 @@
+"""Blockweiser CSV-Import ergibt denselben Store wie der Neubau aus der Pickle-Datei."""
+import gzip
+import pickle
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from conftest import small_athlete_events
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'benchmarks'))
+
+from synthetic_data import write_csv  # noqa: E402
+
+
+def decoded(df):
+    # Kategorien-Reihenfolge hängt vom Weg ab (sortiert vs. erstes Auftreten) – Werte vergleichen
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def test_chunked_csv_ingest_matches_pickle_rebuild(athlete_events_source, tmp_path):
+    from column_store import open_store, read_meta
+    from data_loader import rebuild_cache
+    from ingest import ingest_csv
+
+    # Gemischte Reihenfolge: jeder Block enthält Zeilen mehrerer Austragungen
+    events = small_athlete_events().sample(frac=1, random_state=0).reset_index(drop=True)
+    source = tmp_path / 'shuffled.pkl.gz'
+    with gzip.open(source, 'wb') as f:
+        pickle.dump(events, f)
+    csv_path = tmp_path / 'athlete_events.csv'
+    write_csv(events, csv_path)
+
+    rebuild_cache(str(source), str(tmp_path / 'pickle.store'))
+    rows = ingest_csv(str(csv_path), str(tmp_path / 'noc_regions.csv'), str(tmp_path / 'csv.store'), chunk_rows=5)
+
+    assert rows == len(events)
+    expected, actual = open_store(str(tmp_path / 'pickle.store')), open_store(str(tmp_path / 'csv.store'))
+    assert sorted(actual.columns) == sorted(expected.columns)
+    pd.testing.assert_frame_equal(decoded(actual), decoded(expected)[list(actual.columns)], check_dtype=False)
+    expected_meta, actual_meta = read_meta(str(tmp_path / 'pickle.store')), read_meta(str(tmp_path / 'csv.store'))
+    assert actual_meta['options'] == expected_meta['options']
+    assert actual_meta['partitions'] == expected_meta['partitions']
+
+
+def test_changed_noc_regions_rebuilds_the_csv_store(athlete_events_source, tmp_path):
+    from data_loader import load_dataset
+
+    csv_path = tmp_path / 'athlete_events.csv'
+    write_csv(small_athlete_events(), csv_path)
+    store = str(tmp_path / 'csv.store')
+    events, meta = load_dataset(str(csv_path), store)
+    assert 'Germany' in events['region'].cat.categories
+
+    noc_regions = tmp_path / 'noc_regions.csv'
+    noc_regions.write_text(noc_regions.read_text().replace('Germany', 'Deutschland'))
+    events, rebuilt = load_dataset(str(csv_path), store)
+
+    assert rebuilt['version'] != meta['version']
+    assert 'Deutschland' in events['region'].cat.categories
+    assert load_dataset(str(csv_path), store)[1]['version'] == rebuilt['version']
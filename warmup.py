@@ -0,0 +1,52 @@
+"""Vorwärmen des Ergebnis-Caches nach einem Deploy.
+
+Berechnet die Figuren und Faktenboxen für die Default-Ansichten des Layouts
+und die am häufigsten angefragten Kombinationen aus einem Request-Log
+(geschrieben vom FigureCache, wenn REQUEST_LOG_PATH gesetzt ist) und legt sie
+im Cache ab. So zahlen die ersten Besucher nach einem Deploy keinen Kaltstart.
+"""
+import json
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def top_requests(log_path, n):
+    """Die n häufigsten (name, args)-Kombinationen aus dem Request-Log."""
+    counts = Counter()
+    try:
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    counts[(entry['name'], json.dumps(entry['args'], ensure_ascii=False))] += 1
+                except (ValueError, KeyError):
+                    continue  # angeschnittene Zeile o. Ä.
+    except FileNotFoundError:
+        return []
+    # JSON-Listen (z. B. die Länderauswahl) wieder hashbar machen
+    return [
+        (name, tuple(tuple(a) if isinstance(a, list) else a for a in json.loads(args)))
+        for (name, args), _ in counts.most_common(n)
+    ]
+
+
+def warm_up(cache, requests):
+    """Ruft die memoisierten Funktionen für alle Anfragen auf; liefert (Anzahl, Sekunden)."""
+    start = time.perf_counter()
+    done = 0
+    # Vorwärm-Aufrufe nicht selbst ins Request-Log schreiben
+    request_log, cache.request_log = cache.request_log, None
+    try:
+        for name, args in dict.fromkeys(requests):
+            try:
+                cache.memoized[name](*args)
+                done += 1
+            except Exception:
+                # Eine kaputte Log-Zeile darf das Vorwärmen nicht abbrechen
+                logger.warning("Vorwärmen fehlgeschlagen: %s%r", name, args, exc_info=True)
+    finally:
+        cache.request_log = request_log
+    return done, time.perf_counter() - start